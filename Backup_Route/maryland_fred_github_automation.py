@@ -14,12 +14,32 @@ Date: 11/11/2025
 """
 
 import os
+import re
+import hashlib
+import sys
+import glob
 import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.error import HTTPError
+import numpy as np
 import pandas as pd
 from fredapi import Fred
-from functools import reduce
 from tqdm import tqdm
 
+# Optional: Parquet copies of the exports (pyarrow is installed by the GitHub workflow)
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+    print("ℹ️ pyarrow not installed — writing CSV exports only.")
+
+# Progress bars only on an interactive terminal (keeps CI logs free of per-series bar updates)
+_tqdm = partial(tqdm, disable=not sys.stderr.isatty(), leave=False)
+
 # ======================================================
 # CONFIGURATION
 # ======================================================
@@ -36,11 +56,30 @@ if not API_KEY:
 fred = Fred(api_key=API_KEY)
 SLEEP_TIME = 0.25
 
+# Parallel fetches, capped by FRED's published limit of 120 requests/minute per key
+MAX_WORKERS = 8
+FRED_RATE_PER_MINUTE = 120
+COUNTY_WORKERS = 4  # counties assembled + written side by side (after the fetch pass)
+
 COUNTY_EXPORT_PATH = "data/counties/"
 MASTER_EXPORT_PATH = "data/master/"
 os.makedirs(COUNTY_EXPORT_PATH, exist_ok=True)
 os.makedirs(MASTER_EXPORT_PATH, exist_ok=True)
 
+# Parquet copies mirror data/ but live outside it (gitignored), so the CI refresh,
+# which commits everything under data/, only ever commits the CSVs
+PARQUET_EXPORT_PATH = "data_parquet/"
+
+# Local cache of downloaded series, reused while FRED's last_updated stamp is unchanged
+SERIES_CACHE_DIR = os.path.join(".cache", "fred")
+os.makedirs(SERIES_CACHE_DIR, exist_ok=True)
+# Cached copies younger than this are trusted outright (no metadata call at all)
+SERIES_CACHE_TTL = int(os.getenv("FRED_CACHE_TTL", 24 * 60 * 60))
+
+# Hashes of the generated docs, kept in the (gitignored) cache rather than next to the outputs in data/
+DOCS_HASH_DIR = os.path.join(".cache", "docs")
+os.makedirs(DOCS_HASH_DIR, exist_ok=True)
+
 DATA_DICT_PATH = os.path.join("data", "data_dictionary.csv")
 SUMMARY_PATH = os.path.join("data", "pipeline_summary.txt")
 
@@ -436,46 +475,261 @@ COUNTIES = {
 
 # from masterdatasetmulticounty_counties import COUNTIES  # optional import if separated
 
+# Flat (one row per county x metric) view of COUNTIES, built once at import
+COUNTIES_DF = pd.DataFrame(
+    [
+        (code, meta["County"], metric, sid, freq)
+        for code, meta in COUNTIES.items()
+        for metric, (sid, freq) in meta["series"].items()
+    ],
+    columns=["County_Code", "County_Name", "Metric", "Series_ID", "Frequency"],
+)
+
 
 # ======================================================
 # HELPER FUNCTIONS
 # ======================================================
 
-def period_to_month_end(series: pd.Series, freq: str) -> pd.DataFrame:
-    """Convert a FRED series to a monthly/annual dataframe with month-end timestamps."""
-    df = pd.DataFrame({"Date": pd.to_datetime(series.index, errors="coerce"), "Value": series.values})
-    df = df.dropna(subset=["Date"])
+def period_to_month_end(long_df: pd.DataFrame) -> pd.DataFrame:
+    """Convert a long (Date, Value, Freq, ...) frame of FRED series to month-end timestamps in one pass."""
+    # fredapi already returns a DatetimeIndex; only re-parse dates that came in untyped
+    if not pd.api.types.is_datetime64_any_dtype(long_df["Date"]):
+        long_df = long_df.assign(Date=pd.to_datetime(long_df["Date"], errors="coerce"))
+    long_df = long_df.dropna(subset=["Date"])
+
+    dates = long_df["Date"]
+    long_df["Date"] = dates.dt.to_period("M").dt.to_timestamp("M").where(
+        long_df["Freq"] == "M",
+        dates.dt.to_period("Y").dt.to_timestamp("M"),
+    )
+    return long_df
+
+
+def make_rate_limiter(rate_per_minute: int, min_interval: float, burst: int = 1):
+    """
+    Thread-safe token bucket: `rate_per_minute` calls per minute, bursts of at most `burst`,
+    calls at least `min_interval` s apart. The bucket starts with `burst` tokens (not a full
+    minute's worth), so no 60 s window ever sees more than rate_per_minute + burst calls.
+    """
+    capacity = float(burst)
+    refill_per_sec = rate_per_minute / 60.0
+    state = {"tokens": capacity, "last": time.monotonic(), "prev_call": 0.0}
+    lock = threading.Lock()
+
+    def acquire():
+        while True:
+            with lock:
+                now = time.monotonic()
+                state["tokens"] = min(capacity, state["tokens"] + (now - state["last"]) * refill_per_sec)
+                state["last"] = now
+                wait = max(
+                    (1 - state["tokens"]) / refill_per_sec if state["tokens"] < 1 else 0.0,
+                    state["prev_call"] + min_interval - now,
+                )
+                if wait <= 0:
+                    state["tokens"] -= 1
+                    state["prev_call"] = now
+                    return
+            time.sleep(wait)
+
+    return acquire
+
+
+# Every FRED request takes a token, so a cold .cache/fred (always the case in CI) costs two
+# per series -- get_series_info + get_series -- and both stay inside the one budget
+acquire_slot = make_rate_limiter(FRED_RATE_PER_MINUTE, SLEEP_TIME / MAX_WORKERS)
+
+# Rate-limited (HTTP 429) requests are retried after RATE_LIMIT_BACKOFF, 2x, 4x, ... seconds
+RATE_LIMIT_RETRIES = 5
+RATE_LIMIT_BACKOFF = 5.0
+
+# fredapi's Fred object is not thread-safe, so each worker thread gets its own
+_thread_local = threading.local()
+
+
+def get_thread_fred() -> Fred:
+    """Return a Fred client owned by the current thread (created on first use)."""
+    client = getattr(_thread_local, "fred", None)
+    if client is None:
+        client = Fred(api_key=API_KEY)
+        _thread_local.fred = client
+    return client
+
+
+def is_rate_limited(err: Exception) -> bool:
+    """True for FRED's 429 response (fredapi re-raises it as ValueError('Too Many Requests...'))."""
+    return getattr(err, "code", None) == 429 or "Too Many Requests" in str(err)
+
+
+def call_fred(request, series_id: str):
+    """Run one FRED request under the rate limiter, backing off and retrying while it is throttled."""
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        acquire_slot()
+        try:
+            return request(series_id)
+        except (HTTPError, ValueError) as err:
+            if not is_rate_limited(err) or attempt == RATE_LIMIT_RETRIES:
+                raise
+            wait = RATE_LIMIT_BACKOFF * 2 ** attempt
+            print(f"⚠️ Rate limit hit for {series_id}, retrying in {wait:.0f}s ({attempt + 1}/{RATE_LIMIT_RETRIES})")
+            time.sleep(wait)
+
+
+def fetch_series(series_id: str) -> pd.Series:
+    """
+    Fetch one FRED series, waiting for a rate-limit token before each request.
+    Series are cached on disk keyed by FRED's `last_updated` stamp, so a rerun only
+    spends one cheap metadata call on series that haven't changed, and none at all
+    on copies fetched within SERIES_CACHE_TTL seconds.
+    """
+    client = get_thread_fred()
+
+    cached = glob.glob(os.path.join(SERIES_CACHE_DIR, f"{glob.escape(series_id)}.?*.pkl"))
+    if cached:
+        newest = max(cached, key=os.path.getmtime)
+        if time.time() - os.path.getmtime(newest) < SERIES_CACHE_TTL:
+            return pd.read_pickle(newest)
+
+    try:
+        info = call_fred(client.get_series_info, series_id)
+        stamp = re.sub(r"[^0-9A-Za-z]+", "", str(info.get("last_updated", "")))
+    except Exception:
+        stamp = ""  # metadata unavailable -> just download (no caching) below
+    cache_path = os.path.join(SERIES_CACHE_DIR, f"{series_id}.{stamp}.pkl")
+
+    if stamp and os.path.exists(cache_path):
+        return pd.read_pickle(cache_path)
+
+    series = call_fred(client.get_series, series_id)
+
+    if stamp and series is not None:
+        # Drop copies from older revisions, then write atomically (other threads may be reading)
+        for old_path in glob.glob(os.path.join(SERIES_CACHE_DIR, f"{glob.escape(series_id)}.*.pkl")):
+            os.remove(old_path)
+        tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+        series.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path)
+
+    return series
+
+
+def export_frame(df: pd.DataFrame, csv_path: str) -> None:
+    """
+    Write `df` as CSV (Tableau / GitHub readers) plus a Snappy Parquet copy under
+    PARQUET_EXPORT_PATH when pyarrow is available.
+    The CSV always goes through pandas, so the committed files keep their existing format.
+    """
+    df.to_csv(csv_path, index=False)
+    if HAVE_PYARROW:
+        # data/counties/X.csv -> data_parquet/counties/X.parquet
+        rel_path = os.path.relpath(os.path.splitext(csv_path)[0] + ".parquet", "data")
+        parquet_path = os.path.join(PARQUET_EXPORT_PATH, rel_path)
+        os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+        df.to_parquet(parquet_path, engine="pyarrow", compression="snappy", index=False)
+
+
+def fetch_all_series(series_ids) -> dict:
+    """
+    Fetch every unique series ID exactly once on the shared thread pool.
+    Returns {series_id: (series, error)}; a failed fetch never cancels the others.
+    """
+    def fetch(series_id):
+        try:
+            return fetch_series(series_id), None
+        except Exception as err:
+            return None, err
+
+    series_ids = list(dict.fromkeys(series_ids))  # unique, first-seen order
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(series_ids) or 1)) as ex:
+        results = ex.map(fetch, series_ids)
+        return dict(zip(series_ids, _tqdm(results, total=len(series_ids), desc="Fetching FRED series")))
 
-    if freq == "M":
-        df["Date"] = df["Date"].dt.to_period("M").dt.to_timestamp("M")
-    else:
-        df["Date"] = df["Date"].dt.to_period("Y").dt.to_timestamp("M")
-        df = df.set_index("Date").resample("ME").ffill().reset_index()
 
-    return df
+def normalize_fetched(fetched: dict, plan: pd.DataFrame) -> dict:
+    """
+    Convert every fetched series to month-end form exactly once, in one vectorized pass.
+    `plan` holds the (Series_ID, Frequency) pairs in use; returns {(series_id, freq): DataFrame[Date, Value]},
+    so a series shared by several counties (or rollups) is never re-transformed.
+    """
+    frames = []
+    for series_id, freq in plan[["Series_ID", "Frequency"]].drop_duplicates().itertuples(index=False):
+        series, fetch_err = fetched.get(series_id, (None, None))
+        if fetch_err is None and series is not None and len(series):
+            frames.append(pd.DataFrame({
+                "Date": series.index, "Value": series.values, "Freq": freq, "Series_ID": series_id,
+            }))
+    if not frames:
+        return {}
 
+    long_df = period_to_month_end(pd.concat(frames, ignore_index=True))
+    return {
+        key: grp[["Date", "Value"]]
+        for key, grp in long_df.groupby(["Series_ID", "Freq"], sort=False)
+    }
 
-def build_county_df(code: str, county_data: dict) -> pd.DataFrame:
-    """Fetch and merge all available series for a single county."""
+
+def build_county_df(code: str, county_data: dict, fetched: dict, normalized: dict) -> pd.DataFrame:
+    """Merge one county's already-fetched, month-end series (see normalize_fetched) into a wide frame."""
     frames = []
 
-    for col_name, (series_id, freq) in tqdm(county_data["series"].items(), desc=f"Loading {code}", leave=False):
+    for col_name, (series_id, freq) in county_data["series"].items():
+        series, fetch_err = fetched.get(series_id, (None, None))
         try:
-            time.sleep(SLEEP_TIME)
-            series = fred.get_series(series_id)
-            if series is None or series.empty:
+            if fetch_err is not None:
+                raise fetch_err
+            if series is None or len(series) == 0 or (series_id, freq) not in normalized:
                 print(f"⚠️ {code} {col_name}: empty or invalid series {series_id}")
                 continue
 
-            df = period_to_month_end(series, freq).rename(columns={"Value": col_name})
-            frames.append(df)
+            frames.append(normalized[(series_id, freq)].assign(Metric=col_name, Freq=freq, Series_ID=series_id))
         except Exception as err:
             print(f"⚠️ {code} {col_name}: failed to load {series_id} -> {err}")
 
     if not frames:
         return pd.DataFrame()
 
-    merged = reduce(lambda l, r: pd.merge(l, r, on="Date", how="outer"), frames)
+    # One long frame (already month-end) -> one array scatter (Date x Metric),
+    # instead of a per-series convert/resample followed by N-1 chained outer merges
+    long_df = pd.concat(frames, ignore_index=True)
+
+    # The scatter below needs unique dates per metric, so drop any metric with repeated dates
+    dupes = long_df.duplicated(["Metric", "Date"], keep=False)
+    if dupes.any():
+        bad = long_df.loc[dupes, ["Metric", "Series_ID"]].drop_duplicates()
+        for col_name, series_id in bad.itertuples(index=False):
+            print(f"⚠️ {code} {col_name}: duplicate dates in {series_id}, skipping")
+        long_df = long_df[~long_df["Metric"].isin(bad["Metric"])]
+        if long_df.empty:
+            return pd.DataFrame()
+
+    # Pre-allocate one date axis: every observed date, plus each annual series' own
+    # month-end grid between its first and last observation (the months resample() inserted)
+    annual = long_df["Freq"] != "M"
+    annual_obs = {
+        metric: grp.set_index("Date")["Value"].sort_index()
+        for metric, grp in long_df[annual].groupby("Metric", sort=False)
+    }
+    date_axis = pd.DatetimeIndex(long_df["Date"].unique())
+    for obs in annual_obs.values():
+        date_axis = date_axis.union(pd.date_range(obs.index[0], obs.index[-1], freq="ME"))
+    date_axis = date_axis.sort_values()
+
+    # Scatter every observation straight into one pre-allocated (date x metric) array:
+    # row = position on the shared axis, column = factorized metric code
+    col_codes, metrics = pd.factorize(long_df["Metric"])
+    values = np.full((len(date_axis), len(metrics)), np.nan, dtype=np.float64)
+    values[date_axis.get_indexer(long_df["Date"]), col_codes] = long_df["Value"].to_numpy(dtype=np.float64)
+    merged = pd.DataFrame(values, index=date_axis, columns=list(metrics))
+
+    # Annual series: each month between a series' own first and last observation takes the
+    # value of its latest observation on or before it, exactly as resample("ME").ffill() did.
+    # A year FRED reports as NaN stays NaN (and so do the months it covers), and no row
+    # holding an observation is ever dropped
+    for metric, obs in annual_obs.items():
+        inside = (date_axis >= obs.index[0]) & (date_axis <= obs.index[-1])
+        merged.loc[inside, metric] = obs.reindex(date_axis[inside], method="ffill").to_numpy(dtype=np.float64)
+
+    merged = merged.rename_axis("Date").reset_index()
     merged.insert(1, "County", county_data["County"])
     merged.insert(2, "County_Code", code)
 
@@ -486,20 +740,40 @@ def build_county_df(code: str, county_data: dict) -> pd.DataFrame:
     return merged.sort_values("Date").reset_index(drop=True)
 
 
+def hash_path(path: str) -> str:
+    """Sidecar file in DOCS_HASH_DIR holding the hash `path` was last generated from."""
+    return os.path.join(DOCS_HASH_DIR, os.path.basename(path) + ".hash")
+
+
+def skip_if_unchanged(path: str, payload_hash: str) -> bool:
+    """True if `path` exists and its recorded hash matches `payload_hash` (output is up to date)."""
+    try:
+        with open(hash_path(path)) as f:
+            return os.path.exists(path) and f.read().strip() == payload_hash
+    except OSError:
+        return False
+
+
+def record_hash(path: str, payload_hash: str) -> None:
+    """Record `payload_hash` as the hash `path` was generated from."""
+    with open(hash_path(path), "w") as f:
+        f.write(payload_hash)
+
+
+# COUNTIES is a static literal, so the generated docs only change when it does
+COUNTIES_HASH = hashlib.blake2b(repr(sorted(COUNTIES.items())).encode(), digest_size=16).hexdigest()
+
+
 def generate_data_dictionary():
     """Generate a CSV dictionary mapping each county & metric to its FRED series ID."""
-    rows = []
-    for code, meta in COUNTIES.items():
-        for metric, (sid, freq) in meta["series"].items():
-            rows.append({
-                "County_Code": code,
-                "County_Name": meta["County"],
-                "Metric": metric,
-                "Series_ID": sid,
-                "Frequency": "Monthly" if freq == "M" else "Annual"
-            })
-    df = pd.DataFrame(rows)
+    if skip_if_unchanged(DATA_DICT_PATH, COUNTIES_HASH):
+        print(f"🗂️ Data dictionary unchanged: {DATA_DICT_PATH}")
+        return
+    df = COUNTIES_DF.assign(
+        Frequency=COUNTIES_DF["Frequency"].eq("M").map({True: "Monthly", False: "Annual"})
+    )
     df.to_csv(DATA_DICT_PATH, index=False)
+    record_hash(DATA_DICT_PATH, COUNTIES_HASH)
     print(f"🗂️ Data dictionary saved to {DATA_DICT_PATH}")
 
 
@@ -530,8 +804,13 @@ Integration:
     - Tableau connects directly to /data/master/maryland_master.csv
     - Optional: Automate monthly GitHub Action refresh
 """
+    summary_hash = hashlib.blake2b(summary.encode(), digest_size=16).hexdigest()
+    if skip_if_unchanged(SUMMARY_PATH, summary_hash):
+        print(f"📝 Pipeline summary unchanged: {SUMMARY_PATH}")
+        return
     with open(SUMMARY_PATH, "w") as f:
         f.write(summary)
+    record_hash(SUMMARY_PATH, summary_hash)
     print(f"📝 Pipeline summary written to {SUMMARY_PATH}")
 
 
@@ -544,25 +823,55 @@ def main():
     print("📊 Fetching FRED/BLS data for all Maryland counties...\n")
     all_dfs = []
 
-    for code, meta in COUNTIES.items():
-        df = build_county_df(code, meta)
-
-        if df.empty:
-            print(f"❗ Skipped {meta['County']} ({code}) - no data found.")
-            continue
-
-        file_name = f"{meta['County'].replace(' ', '_')}.csv"
-        csv_path = os.path.join(COUNTY_EXPORT_PATH, file_name)
-        df.to_csv(csv_path, index=False)
-        print(f"✅ Exported: {csv_path}")
-        all_dfs.append(df)
+    # Pass 1: one global fetch plan -- each unique series ID is downloaded once,
+    # however many counties reference it
+    fetched = fetch_all_series(COUNTIES_DF["Series_ID"])
+    normalized = normalize_fetched(fetched, COUNTIES_DF)
+
+    # One background writer drains (df, path) jobs, so disk I/O never blocks the county assembly
+    write_queue = queue.Queue()
+    write_errors = []
+
+    def drain_writes():
+        while (job := write_queue.get()) is not None:
+            df, path = job
+            try:
+                export_frame(df, path)
+                print(f"✅ Exported: {path}")
+            except Exception as err:
+                write_errors.append(err)
+                print(f"⚠️ Failed to write {path} -> {err}")
+
+    writer = threading.Thread(target=drain_writes, name="csv-writer", daemon=True)
+    writer.start()
+
+    def build_one(item):
+        """Build one county and queue its export; returns (code, meta, df)."""
+        code, meta = item
+        df = build_county_df(code, meta, fetched, normalized)
+        if not df.empty:
+            file_name = f"{meta['County'].replace(' ', '_')}.csv"
+            write_queue.put((df, os.path.join(COUNTY_EXPORT_PATH, file_name)))
+        return code, meta, df
+
+    # Pass 2: assemble counties from the fetched series (no network); merges of
+    # independent counties overlap on the thread pool while the writer saves finished ones
+    with ThreadPoolExecutor(max_workers=COUNTY_WORKERS) as ex:
+        results = ex.map(build_one, COUNTIES.items())
+        for code, meta, df in _tqdm(results, total=len(COUNTIES), desc="Building counties"):
+            if df.empty:
+                print(f"❗ Skipped {meta['County']} ({code}) - no data found.")
+                continue
+            all_dfs.append(df)
 
-    # Merge into master dataset
+    # Merge into master dataset (written by the same background writer)
     if all_dfs:
-        master_df = pd.concat(all_dfs, ignore_index=True).sort_values(["County", "Date"])
+        # Each county frame is a single County already sorted by Date, so ordering the frames
+        # by name before the concat gives the (County, Date) order without a 50k-row string sort
+        all_dfs.sort(key=lambda d: d["County"].iat[0])
+        master_df = pd.concat(all_dfs, ignore_index=True)
         master_path = os.path.join(MASTER_EXPORT_PATH, "maryland_master.csv")
-        master_df.to_csv(master_path, index=False)
-        print(f"\n🎉 Master dataset saved: {master_path}")
+        write_queue.put((master_df, master_path))
         print(f"📊 {master_df.shape[0]} rows × {master_df.shape[1]} columns")
     else:
         print("\n❗ No valid data retrieved. Check FRED connection or series IDs.")
@@ -571,6 +880,12 @@ def main():
     generate_data_dictionary()
     generate_pipeline_summary()
 
+    # Wait for queued exports before reporting
+    write_queue.put(None)
+    writer.join()
+    if all_dfs and not write_errors:
+        print(f"\n🎉 Master dataset saved: {master_path}")
+
     print(f"\n⏱️ Runtime: {time.time() - start_time:.2f} seconds")
 
 # ----------------------------------------------
@@ -33,16 +33,31 @@
 
 
 # Install all necessary packages
-# If it is already installed, it will skip the installation
-get_ipython().system('pip install openpyxl PyYAML fredapi dash plotly')
+# Only calls pip when a package can't be imported, so re-running the notebook skips the resolver
+import importlib.util
+import subprocess
+import sys
+
+required_packages = {  # pip name -> import name
+    "openpyxl": "openpyxl",
+    "PyYAML": "yaml",
+    "fredapi": "fredapi",
+    "dash": "dash",
+    "plotly": "plotly",
+    "ipywidgets": "ipywidgets",
+    "anywidget": "anywidget",  # go.FigureWidget backend for the dropdowns (plotly >= 6)
+}
+missing = [pip_name for pip_name, module in required_packages.items() if importlib.util.find_spec(module) is None]
+if missing:
+    subprocess.check_call([sys.executable, "-m", "pip", "install", *missing])
 
 
 # In[2]:
 
 
-# Upgrade Dash
-get_ipython().system('pip install --upgrade dash')
-get_ipython().system('pip install --upgrade typing_extensions')
+# Upgrade Dash (only needed once, so it no longer runs on every kernel start)
+# Uncomment and run manually if the installed Dash is out of date:
+# subprocess.check_call([sys.executable, "-m", "pip", "install", "--upgrade", "dash", "typing_extensions"])
 
 
 # ### Imports
@@ -52,17 +67,21 @@ get_ipython().system('pip install --upgrade typing_extensions')
 
 
 import pandas as pd  # Data cleaning
-from fredapi import Fred  # Accessing data
+import numpy as np  # Vectorized group assignment
+from openpyxl import load_workbook  # Read the series ID workbook without pandas' Excel parser
 import os  # File management (reading and saving)
 import yaml  # Load API key from a YAML file for security purposes
 import re  # For file naming manipulation
+import pickle  # Cache the CSV file index between runs
 import time  # To buffer API requests
 from urllib.error import HTTPError  # Handle API request limit
-from dash import Dash, html, dcc, callback, Output, Input  # To make interactive dashboards
-import plotly.express as px  # To make interactive graphs
+# Plotly is imported in the graph cells below (and Dash/fredapi where an app or API call needs them),
+# so the data-prep cells above don't pay their import cost on every kernel restart
 
 from pathlib import Path  # To search through files/documents
 
+VERBOSE = False  # Set True to print the full county/metric/file listings below
+
 
 # In[4]:
 
@@ -87,6 +106,17 @@ print("County-Level:", county_base_dir.exists(), county_base_dir.is_dir())
 # Helper Function for File Naming #
 # ------------------------------- #
 
+# Translation table for ASCII: space, /, \, - become _; other non-alphanumeric chars are dropped
+_SNAKE_XLATE = {
+    c: None for c in range(128)
+    if not (chr(c).islower() or chr(c).isdigit() or chr(c) == "_")
+}
+_SNAKE_XLATE.update({ord(c): "_" for c in " /\\-"})
+
+# Compile patterns once so each call skips the regex cache lookup
+_RE_NONALNUM = re.compile(r"[^a-z0-9_]")  # only needed for non-ASCII input
+_RE_MULTI = re.compile(r"_+")            # runs of underscores
+
 # Ensure snake_case and proper naming convention
 def to_snake_case(s):
     """
@@ -96,12 +126,160 @@ def to_snake_case(s):
     - remove parentheses, slashes, colons, and other special characters
     - collapse multiple underscores
     """
-    s = s.lower()                      # lowercase
-    s = re.sub(r"[ /\\\-]", "_", s)    # replace space, /, \, - with _
-    s = re.sub(r"[^a-z0-9_]", "", s)   # remove all non-alphanumeric and non-underscore chars
-    s = re.sub(r"_+", "_", s)          # collapse multiple underscores
-    s = s.strip("_")                    # remove leading/trailing underscores
-    return s
+    s = s.lower().translate(_SNAKE_XLATE)  # lowercase, swap separators, drop special chars
+    if not s.isascii():
+        s = _RE_NONALNUM.sub("", s)        # table only covers ASCII, so strip anything else
+    s = _RE_MULTI.sub("_", s)              # collapse multiple underscores
+    return s.strip("_")                    # remove leading/trailing underscores
+
+def to_snake_case_series(s):
+    """
+    Vectorized to_snake_case for a pandas Series of strings (same rules, one pass per step).
+    """
+    return (
+        s.str.lower()
+        .str.translate(_SNAKE_XLATE)
+        .str.replace(_RE_NONALNUM, "", regex=True)
+        .str.replace(_RE_MULTI, "_", regex=True)
+        .str.strip("_")
+    )
+
+# ------------------------------------- #
+# Helper Function for Directory Listing #
+# ------------------------------------- #
+
+def _list_csvs(base, top_level_dirs=None):
+    """
+    Recursively collect every .csv path (as a plain string) under `base`.
+    Uses os.scandir so each directory is read once without building Path objects.
+    If `top_level_dirs` is given, only first-level folders whose lowercase name is in it are walked.
+    """
+    out = []
+    base = str(base)
+    stack = [base]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        # Prune non-target subtrees at the first level instead of filtering each file later
+                        if top_level_dirs is not None and d == base and entry.name.lower() not in top_level_dirs:
+                            continue
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".csv"):
+                        out.append(entry.path)
+        except FileNotFoundError:
+            continue  # base folder hasn't been created yet
+    return out
+
+# Sidecar cache of CSV listings, so an unchanged csv_outputs/ tree isn't re-walked every run
+INDEX_CACHE = Path(".csv_index_cache.pkl")
+
+def _dir_stamp(base):
+    """
+    Modification times of `base` and its first-level folders (the county/state folders).
+    Adding or removing a CSV in any of them bumps its mtime, which invalidates the cache.
+    """
+    base = str(base)
+    try:
+        stamp = [(base, os.stat(base).st_mtime_ns)]
+        with os.scandir(base) as it:
+            stamp.extend(
+                (entry.name, entry.stat(follow_symlinks=False).st_mtime_ns)
+                for entry in it
+                if entry.is_dir(follow_symlinks=False)
+            )
+    except FileNotFoundError:
+        return None  # base folder hasn't been created yet
+    return sorted(stamp)
+
+def _cached_list_csvs(base, top_level_dirs=None):
+    """
+    Same result as _list_csvs, but reused from INDEX_CACHE when the folder mtimes are unchanged.
+    """
+    key = (str(base), tuple(sorted(top_level_dirs)) if top_level_dirs is not None else None)
+    stamp = _dir_stamp(base)
+
+    cache = {}
+    if INDEX_CACHE.exists():
+        try:
+            cache = pickle.loads(INDEX_CACHE.read_bytes())
+        except (pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            cache = {}  # unreadable cache: rebuild it
+
+    hit = cache.get(key)
+    if stamp is not None and hit is not None and hit[0] == stamp:
+        return hit[1]
+
+    paths = _list_csvs(base, top_level_dirs)
+    if stamp is not None:
+        cache[key] = (stamp, paths)
+        INDEX_CACHE.write_bytes(pickle.dumps(cache, protocol=pickle.HIGHEST_PROTOCOL))
+    return paths
+
+def _folder_csvs(folder):
+    """
+    List (lowercase stem, path string) pairs for the .csv files directly inside `folder`.
+    Plain-string stand-in for folder.glob("*.csv") that skips Path.stem per file.
+    """
+    with os.scandir(folder) as it:
+        return [
+            (entry.name[:-4].lower(), entry.path)
+            for entry in it
+            if entry.name.endswith(".csv") and not entry.name.startswith(".") and entry.is_file()
+        ]
+
+# ---------------------------------- #
+# Helper Function for Reading Sheets #
+# ---------------------------------- #
+
+def _sheet_rows(ws, skip_rows=0):
+    """
+    Return a read-only worksheet's rows as a list of value tuples, header row first.
+    Trailing all-empty rows are dropped, as pd.read_excel does.
+    """
+    rows = list(ws.iter_rows(min_row=skip_rows + 1, values_only=True))
+    while rows and all(v is None for v in rows[-1]):
+        rows.pop()
+    return rows
+
+# ------------------------------------ #
+# Helper Functions for Metric Grouping #
+# ------------------------------------ #
+
+def _combine_group_patterns(group_patterns):
+    """
+    Join a {group: compiled pattern} dict into one regex with a named group per group.
+    Each branch is an anchored lookahead, so branches are tried in dict order and
+    the first group that matches anywhere in the metric wins (same as trying them one by one).
+    """
+    return re.compile(
+        "|".join(f"^(?=.*?(?P<{group}>{pattern.pattern}))" for group, pattern in group_patterns.items()),
+        re.IGNORECASE,
+    )
+
+def _classify_metrics(metric_list, group_re):
+    """
+    Assign each metric to a group with one pass of the combined regex over the column.
+    Returns a long-form DataFrame with columns group/metric, ordered by group;
+    metrics that match no group are dropped.
+    """
+    group_names = list(group_re.groupindex)  # named groups, in pattern order
+    metric_series = pd.Series(metric_list, dtype="object")
+    group_hits = metric_series.str.extract(group_re)  # only the winning group's column is filled
+    group_masks = [group_hits[group].notna() for group in group_names]
+    groups = np.select(group_masks, group_names, default="")  # "" = no group
+
+    # Categorical group: "" falls outside the categories (-> NaN) and sorting follows group order
+    groups = pd.Categorical(groups, categories=group_names, ordered=True)
+
+    return (
+        pd.DataFrame({"group": groups, "metric": metric_series})
+        .dropna(subset=["group"])
+        .sort_values("group", kind="stable")
+        .reset_index(drop=True)
+    )
 
 # -------------------------------- #
 # Loading Data with Series ID Info #
@@ -110,18 +288,31 @@ def to_snake_case(s):
 # Load table with series IDs that is downloaded from Google Drive
 file_path = "Indicators Series ID List.xlsx"  # Can be updated if Excel file changes
 
-# County Series IDs
-county_sheet = "COUNTY FRED"  # Can be updated if Excel file changes
-    # Read  Excel file -- Note: Skipping first row, since column headings are merged in row 0
-county_series_id_df = pd.read_excel(file_path, sheet_name=f"{county_sheet}", skiprows=1)
+# Open the workbook once in read-only mode and pull rows straight from openpyxl
+# (skips pandas' per-cell type inference; both sheets share the same open workbook)
+series_id_workbook = load_workbook(file_path, read_only=True, data_only=True)
+try:
+    # County Series IDs
+    county_sheet = "COUNTY FRED"  # Can be updated if Excel file changes
+        # Read  Excel sheet -- Note: Skipping first row, since column headings are merged in row 0
+        # Only COUNTY is used in this notebook, so only that column is kept
+    county_rows = _sheet_rows(series_id_workbook[county_sheet], skip_rows=1)
+    county_col = county_rows[0].index("COUNTY")
+    county_series_id_df = pd.DataFrame(
+        {"COUNTY": [row[county_col] for row in county_rows[1:]]}, dtype="object"
+    )
 
-# Clean the COUNTY column (for any extra spaces) - must match FRED API County Names
-county_series_id_df["COUNTY"] = county_series_id_df["COUNTY"].astype(str).str.strip()
+    # State of Maryland Series IDs
+    state_sheet = "MD FRED"  # Can be updated if Excel file changes
+        # Read  Excel sheet
+    state_rows = _sheet_rows(series_id_workbook[state_sheet])
+    state_series_id_df = pd.DataFrame(state_rows[1:], columns=state_rows[0])
+finally:
+    series_id_workbook.close()  # read-only workbooks keep the file handle open until closed
 
-# State of Maryland Series IDs
-state_sheet = "MD FRED"  # Can be updated if Excel file changes
-    # Read  Excel file
-state_series_id_df = pd.read_excel(file_path, sheet_name=f"{state_sheet}")
+# Clean the COUNTY column (for any extra spaces) - must match FRED API County Names
+    # Stored as category: ~24 distinct names repeated across many series rows
+county_series_id_df["COUNTY"] = county_series_id_df["COUNTY"].astype(str).str.strip().astype("category")
 
 
 # In[6]:
@@ -130,14 +321,16 @@ state_series_id_df = pd.read_excel(file_path, sheet_name=f"{state_sheet}")
 # Organizing list of counties
 county_list = county_series_id_df["COUNTY"].unique().tolist()
 
-# Convert to snake_case using the function
-county_list_snake = [to_snake_case(c) for c in county_list]
+# Convert to snake_case using the function (vectorized over the whole list)
+county_list_snake = to_snake_case_series(pd.Series(county_list, dtype="object")).tolist()
+county_set = frozenset(county_list_snake)  # O(1) membership checks on folder names
 
-print("Original counties:")
-print(county_list)
-print("-"*60)
-print("Snake-case counties:")
-print(county_list_snake)
+if VERBOSE:
+    print("Original counties:")
+    print(county_list)
+    print("-"*60)
+    print("Snake-case counties:")
+    print(county_list_snake)
 
 
 # In[ ]:
@@ -154,18 +347,29 @@ print(county_list_snake)
 # ----------------------------------------------- #
 county_metric_set = set()
 
-for file in county_base_dir.rglob("*.csv"):
-    folder_lower = file.parent.name.lower()
-    
+# Walk the county tree once; the same list is reused for the group-file dictionary below
+county_csv_paths = _cached_list_csvs(county_base_dir, top_level_dirs=county_set)  # skip non-county folders
+
+# Group file names by their folder so per-folder work is done once
+county_csvs_by_folder = {}
+for path in county_csv_paths:
+    folder, file_name = os.path.split(path)
+    county_csvs_by_folder.setdefault(folder, []).append(file_name)
+
+for folder, file_names in county_csvs_by_folder.items():
+    folder_lower = os.path.basename(folder).lower()
+
     # Only include counties in your list
-    if folder_lower in county_list_snake:
+    if folder_lower not in county_set:
+        continue
+
+    # Ensure we only remove the **exact folder name prefix**
+    prefix = folder_lower + "_"
+    for file_name in file_names:
         # Get filename without extension
-        name_only = file.stem  # e.g., "baltimore_city_resident_population"
-        
-        # Ensure we only remove the **exact folder name prefix**
-        prefix = folder_lower + "_"
-        if name_only.startswith(prefix):
-            metric = name_only[len(prefix):]  # remove the prefix safely
+        name_only = os.path.splitext(file_name)[0]  # e.g., "baltimore_city_resident_population"
+        metric = name_only.removeprefix(prefix)
+        if metric != name_only:  # prefix was present
             county_metric_set.add(metric)
 
 # Convert to a sorted list
@@ -182,31 +386,21 @@ group_county_patterns = {
     "economy": re.compile(r"poverty|gdp|population", re.IGNORECASE)
 }
 
-# --- Assign metrics to groups ---
-grouped_county_metrics = {group: [] for group in group_county_patterns.keys()}
-
-for metric in county_metric_list:
-    for group, pattern in group_county_patterns.items():  # corrected
-        if pattern.search(metric):
-            grouped_county_metrics[group].append(metric)
-            break
+# --- Compile the group patterns into one named-group regex ---
+_COUNTY_GROUP_RE = _combine_group_patterns(group_county_patterns)
 
-# --- Convert to a long-form DataFrame ---
-rows = []
-for group, metrics in grouped_county_metrics.items():
-    for metric in metrics:
-        rows.append({"group": group, "metric": metric})
-
-county_metrics_df = pd.DataFrame(rows)
+# --- Assign metrics to groups (long-form DataFrame) ---
+county_metrics_df = _classify_metrics(county_metric_list, _COUNTY_GROUP_RE)
 
 # --- Output ---
-print("Metrics List:")
-print(county_metric_list)
+if VERBOSE:
+    print("Metrics List:")
+    print(county_metric_list)
 
-print("-"*60)
+    print("-"*60)
 
-print("Metrics DataFrame (grouped):")
-print(county_metrics_df)
+    print("Metrics DataFrame (grouped):")
+    print(county_metrics_df.head().to_string())
 
 
 # In[8]:
@@ -217,9 +411,12 @@ print(county_metrics_df)
 # ----------------------------------------------- #
 state_metric_set = set()
 
-for file in state_base_dir.rglob("*.csv"):
+# Walk the state tree once; the same list is reused for the group-file dictionary below
+state_csv_paths = _cached_list_csvs(state_base_dir)
+
+for path in state_csv_paths:
     # Get filename without extension
-    metric = file.stem  # e.g., "resident_population"
+    metric = os.path.splitext(os.path.basename(path))[0]  # e.g., "resident_population"
     state_metric_set.add(metric)
 
 # Convert to a sorted list
@@ -242,31 +439,21 @@ group_state_patterns = {
 }
 
 
-# --- Assign metrics to groups ---
-grouped_state_metrics = {group: [] for group in group_state_patterns.keys()}
-
-for metric in state_metric_list:
-    for group, pattern in group_state_patterns.items():
-        if pattern.search(metric):
-            grouped_state_metrics[group].append(metric)
-            break
+# --- Compile the group patterns into one named-group regex ---
+_STATE_GROUP_RE = _combine_group_patterns(group_state_patterns)
 
-# --- Convert to a long-form DataFrame ---
-rows = []
-for group, metrics in grouped_state_metrics.items():
-    for metric in metrics:
-        rows.append({"group": group, "metric": metric})
-
-state_metrics_df = pd.DataFrame(rows)
+# --- Assign metrics to groups (long-form DataFrame) ---
+state_metrics_df = _classify_metrics(state_metric_list, _STATE_GROUP_RE)
 
 # --- Output ---
-print("State Metrics List:")
-print(state_metric_list)
+if VERBOSE:
+    print("State Metrics List:")
+    print(state_metric_list)
 
-print("-"*60)
+    print("-"*60)
 
-print("State Metrics DataFrame (grouped):")
-print(state_metrics_df)
+    print("State Metrics DataFrame (grouped):")
+    print(state_metrics_df.head().to_string())
 
 
 # In[10]:
@@ -274,27 +461,23 @@ print(state_metrics_df)
 
 # Dictionary to store STATE-LEVEL files by group
 
-state_group_file_dict = {}
-
-# Loop over each group in metrics_df
-for group in ["housing", "labor", "economy"]:
-    # List of metrics in this group
-    metrics_in_group = county_metrics_df[county_metrics_df['group'] == group]['metric'].tolist()
-    
-    matching_files = []
-    for file in state_base_dir.rglob("*.csv"):
-        file_name = file.stem.lower()
-        # Check if any metric in this group is in the filename
-        if any(metric.lower() in file_name for metric in metrics_in_group):
-            matching_files.append(file)
-    
-    state_group_file_dict[group] = matching_files
+# Invert the grouped metrics once so each file needs a single lookup
+metric_to_group_state = dict(zip(state_metrics_df["metric"].str.lower(), state_metrics_df["group"]))
+
+state_group_file_dict = {group: [] for group in ["housing", "labor", "economy"]}
+
+for path in state_csv_paths:
+    file_name = os.path.splitext(os.path.basename(path))[0].lower()
+    group = metric_to_group_state.get(file_name)
+    if group is not None:
+        state_group_file_dict[group].append(path)
 
 # --- Output ---
-for group, files in state_group_file_dict.items():
-    print(f"\nGroup: {group}")
-    for f in files:
-        print(f)
+if VERBOSE:
+    for group, files in state_group_file_dict.items():
+        print(f"\nGroup: {group}")
+        for f in files:
+            print(f)
 
 
 # In[22]:
@@ -302,43 +485,48 @@ for group, files in state_group_file_dict.items():
 
 # Dictionary to store COUNTY-LEVEL files by group
 
-# Initialize nested dictionary
-county_group_file_dict = {}
-
-# Loop through all counties in county_list_snake
-for county in county_list_snake:
-    county_dir = county_base_dir / county
-    if not county_dir.exists():
-        continue  # skip if folder doesn't exist
-
-    # Filter metrics by group
-    for group in ["housing", "labor", "economy"]:
-        # Get metrics in this group
-        metrics_in_group = state_metrics_df[state_metrics_df['group'] == group]['metric'].tolist()
-        
-        # Find all CSVs in the county folder that match metrics in this group
-        matching_files = []
-        for file in county_dir.rglob("*.csv"):
-            file_name = file.stem.lower()
-            # Remove county prefix if present
-            prefix = county + "_"
-            if file_name.startswith(prefix):
-                metric_name = file_name[len(prefix):]
-            else:
-                metric_name = file_name
-            if any(metric.lower() == metric_name for metric in metrics_in_group):
-                matching_files.append(file)
-        
-        # Add to nested dictionary
-        county_group_file_dict.setdefault(county, {})[group] = matching_files
+# --- One row per county CSV: (county, metric, path) ---
+county_file_rows = []
+for path in county_csv_paths:
+    county = os.path.relpath(path, county_base_dir).split(os.sep, 1)[0]
+    if county not in county_set:
+        continue  # only include counties in your list
+    file_name = os.path.splitext(os.path.basename(path))[0].lower()
+    metric_name = file_name.removeprefix(county + "_")  # remove county prefix if present
+    county_file_rows.append((county, metric_name, path))
+
+county_file_df = pd.DataFrame(county_file_rows, columns=["county", "metric", "path"])
+
+# --- Attach each file's group with one hash join against the grouped metrics ---
+# (first group wins if a metric name repeats, so the join stays many-to-one)
+metric_groups_df = (
+    state_metrics_df[["metric", "group"]]
+    .assign(metric=state_metrics_df["metric"].str.lower())
+    .drop_duplicates("metric")
+)
+county_file_df = county_file_df.merge(
+    metric_groups_df, on="metric", how="inner", validate="many_to_one", copy=False
+)
+paths_by_county_group = county_file_df.groupby(["county", "group"], sort=False, observed=True)["path"].apply(list).to_dict()
+
+# --- Build nested dictionary (every existing county folder gets all three groups) ---
+county_group_file_dict = {
+    county: {
+        group: paths_by_county_group.get((county, group), [])
+        for group in ["housing", "labor", "economy"]
+    }
+    for county in county_list_snake
+    if (county_base_dir / county).exists()  # skip if folder doesn't exist
+}
 
 # --- Example output ---
-for county, groups in county_group_file_dict.items():
-    print(f"\nCounty: {county}")
-    for group, files in groups.items():
-        print(f"  Group: {group}")
-        for f in files:
-            print(f"    {f}")
+if VERBOSE:
+    for county, groups in county_group_file_dict.items():
+        print(f"\nCounty: {county}")
+        for group, files in groups.items():
+            print(f"  Group: {group}")
+            for f in files:
+                print(f"    {f}")
 
 
 # In[23]:
@@ -349,20 +537,108 @@ for county, groups in county_group_file_dict.items():
 # ============================================
 
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import importlib.util
+import os
 import re
 import pandas as pd
 import plotly.express as px
 
+# Optional: downsample long series (LTTB) so zoom/pan stays responsive with many counties x years
+# mode="auto" wraps every figure (px.* and go.Figure/make_subplots) once it has enough points
+try:
+    from plotly_resampler import register_plotly_resampler
+    register_plotly_resampler(mode="auto")
+except ImportError:
+    print("[INFO] plotly-resampler not installed; figures will plot every point. Install with: pip install plotly-resampler")
+
 # Use the same county_base_dir as before
 county_base_dir = Path("csv_outputs/county_data")
 
-# Helper: snake_case (same as before)
-def to_snake_case(s: str) -> str:
-    s = s.lower()
-    s = re.sub(r"[ /\\\-]", "_", s)
-    s = re.sub(r"[^a-z0-9_]", "", s)
-    s = re.sub(r"_+", "_", s)
-    return s.strip("_")
+# Helper: snake_case -- reuses to_snake_case from the helpers cell above (precompiled patterns)
+
+# Helper: Parquet sidecars
+# Each CSV is parsed once and saved as a typed, compressed <name>.parquet next to it;
+# later reads load the sidecar (only the requested columns) while it is newer than the CSV.
+# Needs pyarrow; without it every read falls back to the CSV.
+HAVE_PARQUET = importlib.util.find_spec("pyarrow") is not None
+if not HAVE_PARQUET:
+    print("[INFO] pyarrow not installed; reading CSVs directly (no Parquet sidecars).")
+
+def read_frame(path, columns=None) -> pd.DataFrame:
+    path = str(path)
+    if not HAVE_PARQUET:
+        df = pd.read_csv(
+            path,
+            usecols=(lambda c: c in columns) if columns is not None else None,
+            engine="c",
+        )
+        # Not every CSV has a date column, so parse it only when present
+        if "date" in df.columns:
+            df["date"] = pd.to_datetime(df["date"], format="ISO8601", cache=True)  # CSVs are written as YYYY-MM-DD
+        return df
+
+    sidecar = os.path.splitext(path)[0] + ".parquet"
+    try:
+        if os.stat(sidecar).st_mtime_ns >= os.stat(path).st_mtime_ns:
+            return pd.read_parquet(sidecar, columns=columns)
+    except FileNotFoundError:
+        pass  # no sidecar yet
+
+    # Full parse so the sidecar can serve any later column selection
+    df = pd.read_csv(path, engine="c")
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"], format="ISO8601", cache=True)
+    try:
+        df.to_parquet(sidecar, compression="zstd", index=False)
+    except OSError as e:
+        print(f"[WARN] Could not write Parquet sidecar {sidecar}: {e}")
+    return df[columns] if columns is not None else df
+
+# Helper: cached metric reads
+# Dropdown changes re-load the same county files, so each file is read once per modification.
+# Keyed on mtime so an updated CSV is re-read; callers must not mutate the returned frame.
+# Metric CSVs are written as date,value (see fred_api.py), so only those columns are kept.
+@lru_cache(maxsize=512)
+def _read_csv_cached(path_str: str, mtime_ns: int) -> pd.DataFrame:
+    return read_frame(path_str, columns=["date", "value"]).astype({"value": "float64"})
+
+def read_metric_csv(path) -> pd.DataFrame:
+    return _read_csv_cached(str(path), os.stat(path).st_mtime_ns)
+
+# Helper: cached county folder listing
+# Widget callbacks list the county folders on every change; re-scan only when the base folder's mtime moves
+@lru_cache(maxsize=1)
+def _county_folder_names_cached(mtime_ns: int) -> tuple:
+    with os.scandir(county_base_dir) as it:
+        return tuple(entry.name for entry in it if entry.is_dir())
+
+def county_folder_names() -> tuple:
+    return _county_folder_names_cached(os.stat(county_base_dir).st_mtime_ns)
+
+# Helper: folder name -> display name, memoized (a few dozen names, looked up on every load/callback)
+@lru_cache(maxsize=None)
+def folder_to_pretty_name(folder_name: str) -> str:
+    return folder_name.replace("_", " ").title()
+
+# Helper: threaded file loads
+# pandas releases the GIL while parsing, so reading several small CSVs on threads overlaps their I/O
+IO_WORKERS = min(16, (os.cpu_count() or 1) * 4)
+
+def thread_map(fn, items) -> list:
+    items = list(items)
+    if len(items) <= 1:
+        return [fn(item) for item in items]  # not worth a pool
+    with ThreadPoolExecutor(max_workers=min(IO_WORKERS, len(items))) as ex:
+        return list(ex.map(fn, items))  # keeps input order
+
+# Helper: stack per-file frames
+# A single frame is returned as-is (no concat copy); otherwise one concat without a column sort
+def concat_frames(frames) -> pd.DataFrame:
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True, copy=False, sort=False)
 
 # -------------------------------------------
 # 1. ECONOMY METRIC STEMS (auto-detected)
@@ -382,6 +658,9 @@ ECONOMY_KEYWORDS = [
     "business",
 ]
 
+# One compiled alternation instead of a Python-level `kw in stem` test per keyword
+_ECON_RE = re.compile("|".join(map(re.escape, ECONOMY_KEYWORDS)))
+
 def detect_economy_metrics(county_snake):
     """
     Detect economy metric CSVs for the county by scanning filenames.
@@ -391,18 +670,16 @@ def detect_economy_metrics(county_snake):
         return []
 
     economy_files = []
-    for path in county_folder.glob("*.csv"):
-        stem = path.stem.lower()
-        for kw in ECONOMY_KEYWORDS:
-            if kw in stem:
-                metric_key = stem[len(county_snake)+1:] if stem.startswith(county_snake+"_") else stem
-                label = metric_key.replace("_", " ").title()
-                economy_files.append({
-                    "key": metric_key,
-                    "label": label,
-                    "path": path
-                })
-                break  # prevent duplicates from multiple keyword matches
+    prefix = county_snake + "_"
+    for stem, path in _folder_csvs(county_folder):
+        if _ECON_RE.search(stem):  # one entry per file, however many keywords match
+            metric_key = stem.removeprefix(prefix)
+            label = metric_key.replace("_", " ").title()
+            economy_files.append({
+                "key": metric_key,
+                "label": label,
+                "path": path
+            })
 
     return sorted(economy_files, key=lambda x: x["label"])
 
@@ -417,15 +694,12 @@ def get_economy_data_for_county(county_name_pretty):
     if not files:
         raise ValueError(f"No economy metrics found for county: {county_name_pretty}")
 
-    frames = []
-    for f in files:
-        df = pd.read_csv(f["path"])
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"])
-        df["metric"] = f["label"]
-        frames.append(df)
+    # assign() returns a new frame, so the cached one stays untouched
+    frames = thread_map(lambda f: read_metric_csv(f["path"]).assign(metric=f["label"]), files)
 
-    return pd.concat(frames, ignore_index=True)
+    df = concat_frames(frames)
+    df["metric"] = df["metric"].astype("category")  # few labels, many rows: groupby on integer codes
+    return df
 
 
 # -------------------------------------------
@@ -436,6 +710,7 @@ def plot_economy_for_county(county_name_pretty):
 
     fig = px.line(
         df,
+        render_mode="webgl",  # WebGL traces: fast pan/zoom with many counties
         x="date",
         y="value",
         color="metric",
@@ -465,13 +740,8 @@ def list_known_counties():
     Look at folder names under county_base_dir and try to build
     'pretty' names for the dropdown.
     """
-    counties = []
-    for p in county_base_dir.iterdir():
-        if p.is_dir():
-            # reverse of to_snake_case: 'prince_georges_county_md' -> 'Prince Georges County Md'
-            pretty = p.name.replace("_", " ").title()
-            counties.append(pretty)
-    return sorted(counties)
+    # reverse of to_snake_case: 'prince_georges_county_md' -> 'Prince Georges County Md'
+    return sorted(map(folder_to_pretty_name, county_folder_names()))
 
 county_options = list_known_counties()
 
@@ -484,10 +754,8 @@ def show_economy(county):
 
 
 def list_county_folders():
-    return [p for p in county_base_dir.iterdir() if p.is_dir()]
+    return [county_base_dir / name for name in county_folder_names()]
 
-def folder_to_pretty_name(folder_name: str) -> str:
-    return folder_name.replace("_", " ").title()
 
 def load_metric_all_counties(metric_substring: str):
     """
@@ -495,35 +763,35 @@ def load_metric_all_counties(metric_substring: str):
     Looks through each county folder, finds the first CSV whose stem
     contains that substring, and loads it.
     """
-    frames = []
+    metric_substring = metric_substring.lower()
 
-    for county_folder in list_county_folders():
+    def _load_one(county_folder):
         county_snake = county_folder.name
         county_pretty = folder_to_pretty_name(county_snake)
 
-        csv_paths = list(county_folder.glob("*.csv"))
         matched = None
-        for path in csv_paths:
-            stem = path.stem.lower()
-            if metric_substring.lower() in stem:
+        for stem, path in _folder_csvs(county_folder):
+            if metric_substring in stem:
                 matched = path
                 break
 
         if matched is None:
-            continue  # this county doesn’t have that metric
+            return None  # this county doesn’t have that metric
 
-        df = pd.read_csv(matched)
-        # Normalize date
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"])
+        # Cached read (date already normalized); assign() leaves the cached frame untouched
+        df = read_metric_csv(matched).assign(county=county_pretty)
         # assume economy value column is named 'value'
-        df["county"] = county_pretty
-        frames.append(df[["date", "value", "county"]])
+        return df[["date", "value", "county"]]
+
+    # One county per thread; counties without the metric drop out
+    frames = [df for df in thread_map(_load_one, list_county_folders()) if df is not None]
 
     if not frames:
         raise ValueError(f"No counties found with metric containing '{metric_substring}'")
 
-    return pd.concat(frames, ignore_index=True)
+    df = concat_frames(frames)
+    df["county"] = df["county"].astype("category")  # ~24 names repeated per row -> small integer codes
+    return df
 
 
 # In[27]:
@@ -537,6 +805,7 @@ def plot_metric_all_counties(metric_substring: str, title=None):
 
     fig = px.line(
         df,
+        render_mode="webgl",
         x="date",
         y="value",
         color="county",
@@ -566,74 +835,30 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 
-# In[30]:
-
-
-def plot_economy_for_county_separate(county_name_pretty):
-    # reuse your loader
-    df = get_economy_data_for_county(county_name_pretty)
-
-    metrics = sorted(df["metric"].unique())
-    n_rows = len(metrics)
-
-    # Create a subplot row for each metric
-    fig = make_subplots(
-        rows=n_rows,
-        cols=1,
-        shared_xaxes=True,
-        subplot_titles=metrics,
-        vertical_spacing=0.06,
-    )
-
-    for i, m in enumerate(metrics, start=1):
-        dfm = df[df["metric"] == m]
-
-        fig.add_trace(
-            go.Scatter(
-                x=dfm["date"],
-                y=dfm["value"],
-                mode="lines+markers",
-                name=m,
-                showlegend=False,   # legend not needed; title shows metric
-            ),
-            row=i,
-            col=1,
-        )
-
-        fig.update_yaxes(title_text="Value", row=i, col=1)
-
-    fig.update_xaxes(title_text="Date", row=n_rows, col=1)
-
-    fig.update_layout(
-        height=250 * n_rows,  # adjust if you want taller/shorter charts
-        title_text=f"Economy Indicators Over Time – {county_name_pretty}",
-    )
-
-    fig.show()
-
-
 # In[31]:
 
 
 def plot_economy_for_county_separate(county_name_pretty):
     df = get_economy_data_for_county(county_name_pretty)
 
-    metrics = sorted(df["metric"].unique())
+    # Partition once instead of one boolean mask per metric (groups come back sorted by metric)
+    groups = list(df.groupby("metric", sort=True, observed=True))
+    metrics = [m for m, _ in groups]
     n_rows = len(metrics)
 
+    # Clean names for titles and hover, computed once per metric
+    pretty_names = {m: m.replace("_", " ").title() for m in metrics}
+
     fig = make_subplots(
         rows=n_rows,
         cols=1,
         shared_xaxes=True,
-        subplot_titles=[m.replace("_", " ").title() for m in metrics],
+        subplot_titles=[pretty_names[m] for m in metrics],
         vertical_spacing=0.06,
     )
 
-    for i, m in enumerate(metrics, start=1):
-        df_m = df[df["metric"] == m].copy()
-
-        # Clean name for hover
-        pretty_metric = m.replace("_", " ").title()
+    for i, (m, df_m) in enumerate(groups, start=1):
+        pretty_metric = pretty_names[m]
 
         # Build hover template
         hover_template = (
@@ -643,7 +868,7 @@ def plot_economy_for_county_separate(county_name_pretty):
         )
 
         fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=df_m["date"],
                 y=df_m["value"],
                 mode="lines+markers",
@@ -670,20 +895,89 @@ def plot_economy_for_county_separate(county_name_pretty):
 
 
 from ipywidgets import interact, Dropdown
+from IPython.display import display
 
-def list_known_counties():
-    counties = []
-    for p in county_base_dir.iterdir():
-        if p.is_dir():
-            pretty = p.name.replace("_", " ").title()
-            counties.append(pretty)
-    return sorted(counties)
-
+# list_known_counties is defined once, in the first dropdown cell above
 county_options = list_known_counties()
 
+# -------------------------------------------
+# Reusable subplot widget for the dropdowns
+# -------------------------------------------
+# Each dropdown keeps one figure; a change only swaps trace data and titles inside
+# batch_update(), and re-lays out the subplot grid only when the county's metric count differs.
+# go.FigureWidget needs anywidget (plotly >= 6); without it the figure is a plain go.Figure
+# that is re-shown under the dropdown on every change.
+HAVE_FIGURE_WIDGET = importlib.util.find_spec("anywidget") is not None
+if not HAVE_FIGURE_WIDGET:
+    print("[INFO] anywidget not installed; dropdowns redraw a static figure. Install with: pip install anywidget")
+
+def metric_subplots(n_rows):
+    n_rows = max(n_rows, 1)
+    fig = make_subplots(
+        rows=n_rows,
+        cols=1,
+        shared_xaxes=True,
+        subplot_titles=[" "] * n_rows,  # placeholders so each row has a title annotation to update
+        vertical_spacing=0.06,
+    )
+    for i in range(1, n_rows + 1):
+        fig.add_trace(
+            go.Scattergl(x=[], y=[], mode="lines+markers", showlegend=False),
+            row=i, col=1
+        )
+        fig.update_yaxes(title_text="Value", row=i, col=1)
+    fig.update_xaxes(title_text="Date", row=n_rows, col=1)
+    fig.update_layout(height=250 * n_rows)
+    return fig
+
+def make_metric_widget(n_rows=1):
+    fig = metric_subplots(n_rows)
+    return go.FigureWidget(fig) if HAVE_FIGURE_WIDGET else fig
+
+def update_metric_widget(fig, df, title, pretty_name):
+    groups = list(df.groupby("metric", sort=True, observed=True))
+    if len(fig.data) != max(len(groups), 1):
+        # Different number of metrics: take the grid (rows, domains, height) of a fresh figure,
+        # so no blank panels are left over (trace removal is not allowed inside batch_update)
+        grid = metric_subplots(len(groups))
+        fig.data = []
+        fig.layout = grid.layout
+        fig.add_traces(grid.data)
+    with fig.batch_update():
+        for i, trace in enumerate(fig.data):
+            if i < len(groups):
+                m, df_m = groups[i]
+                name = pretty_name(m)
+                trace.x = df_m["date"].values
+                trace.y = df_m["value"].values
+                trace.name = name
+                trace.hovertemplate = (
+                    f"<b>{name}</b><br>" +
+                    "Date: %{x|%Y-%m-%d}<br>" +
+                    "Value: %{y:,.2f}<extra></extra>"
+                )
+                fig.layout.annotations[i].text = name
+            else:
+                # no metrics at all: the single placeholder row stays empty
+                trace.x, trace.y = [], []
+                fig.layout.annotations[i].text = ""
+        fig.layout.title.text = title
+    if not HAVE_FIGURE_WIDGET:
+        fig.show()
+
+economy_fig = make_metric_widget()
+
 @interact(county=Dropdown(options=county_options, description="County:"))
 def show_economy(county):
-    plot_economy_for_county_separate(county)
+    update_metric_widget(
+        economy_fig,
+        get_economy_data_for_county(county),
+        f"Economy Indicators Over Time – {county}",
+        lambda m: m.replace("_", " ").title(),
+    )
+
+if HAVE_FIGURE_WIDGET:
+    display(economy_fig)
 
 
 # In[33]:
@@ -700,6 +994,13 @@ LABOR_KEYWORDS = [
     "unemployed_rate_percentage",
 ]
 
+# One compiled regex; each branch is an anchored lookahead so the first keyword
+# in list order wins, exactly like looping over LABOR_KEYWORDS
+_LABOR_RE = re.compile("|".join(f"^(?=.*?({re.escape(kw)}))" for kw in LABOR_KEYWORDS))
+
+# Display labels, built once instead of on every detect/plot call
+LABOR_LABELS = {kw: kw.replace("_", " ").title() for kw in LABOR_KEYWORDS}
+
 def detect_labor_metrics(county_snake):
     """
     Scan the county folder for labor metric CSVs.
@@ -709,17 +1010,16 @@ def detect_labor_metrics(county_snake):
         return []
 
     labor_files = []
-    for path in county_folder.glob("*.csv"):
-        stem = path.stem.lower()
-        for kw in LABOR_KEYWORDS:
-            if kw in stem:
-                label = kw.replace("_", " ").title()
-                labor_files.append({
-                    "key": kw,
-                    "label": label,
-                    "path": path
-                })
-                break
+    for stem, path in _folder_csvs(county_folder):
+        m = _LABOR_RE.search(stem)
+        if m:
+            kw = m.group(m.lastindex)  # the keyword whose branch matched
+            label = LABOR_LABELS[kw]
+            labor_files.append({
+                "key": kw,
+                "label": label,
+                "path": path
+            })
 
     return sorted(labor_files, key=lambda x: x["label"])
 
@@ -735,15 +1035,12 @@ def get_labor_data_for_county(county_name_pretty):
     if not files:
         raise ValueError(f"No labor metrics found for county: {county_name_pretty}")
 
-    frames = []
-    for f in files:
-        df = pd.read_csv(f["path"])
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"])
-        df["metric"] = f["key"]      # raw metric key
-        frames.append(df[["date", "value", "metric"]])
+    # cached frame is already just date,value -> date, value, metric (raw metric key)
+    frames = thread_map(lambda f: read_metric_csv(f["path"]).assign(metric=f["key"]), files)
 
-    return pd.concat(frames, ignore_index=True)
+    df = concat_frames(frames)
+    df["metric"] = df["metric"].astype("category")
+    return df
 
 
 # In[34]:
@@ -757,22 +1054,22 @@ def plot_labor_for_county_separate(county_name_pretty):
     df = get_labor_data_for_county(county_name_pretty)
 
     # Sort metrics alphabetically so the order is consistent
-    metrics = sorted(df["metric"].unique())
+    # Partition once instead of one boolean mask per metric (groups come back sorted by metric)
+    groups = list(df.groupby("metric", sort=True, observed=True))
+    metrics = [m for m, _ in groups]
     n_rows = len(metrics)
 
     fig = make_subplots(
         rows=n_rows,
         cols=1,
         shared_xaxes=True,
-        subplot_titles=[m.replace("_", " ").title() for m in metrics],
+        subplot_titles=[LABOR_LABELS[m] for m in metrics],
         vertical_spacing=0.06,
     )
 
-    for i, m in enumerate(metrics, start=1):
-        df_m = df[df["metric"] == m]
-
+    for i, (m, df_m) in enumerate(groups, start=1):
         fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=df_m["date"],
                 y=df_m["value"],
                 mode="lines+markers",
@@ -799,131 +1096,20 @@ def plot_labor_for_county_separate(county_name_pretty):
 
 from ipywidgets import interact, Dropdown
 
-@interact(county=Dropdown(options=list_known_counties(), description="County:"))
-def show_labor(county):
-    plot_labor_for_county_separate(county)
-
-
-# In[36]:
-
-
-from pathlib import Path
-import pandas as pd
-import plotly.express as px
-
-# Base directory (you already have this in the notebook)
-county_base_dir = Path("csv_outputs/county_data")
+# Same single-figure pattern as the economy dropdown
+labor_fig = make_metric_widget()
 
-# --------------------------------------------
-# HOUSING – CONFIG
-# --------------------------------------------
-
-housing_metrics = {
-    # 1) Active listing count
-    "active_listing_count": {
-        "file": county_base_dir / "housing_active_listing_count.csv",
-        "value_col": "active_listing_count",
-        "title": "Housing Inventory: Active Listing Count by County",
-        "yaxis_title": "Active Listings (Count)",
-    },
-    # 2) Median listing price
-    "median_listing_price": {
-        "file": county_base_dir / "housing_median_listing_price.csv",
-        "value_col": "median_listing_price",
-        "title": "Housing Inventory: Median Listing Price by County",
-        "yaxis_title": "Median Listing Price (USD)",
-    },
-    # 3) New private housing units authorized
-    "new_private_units": {
-        "file": county_base_dir / "housing_new_private_units.csv",
-        "value_col": "new_private_units",
-        "title": "New Private Housing Units Authorized by County",
-        "yaxis_title": "Units Authorized",
-    },
-    # 4) All-transactions house price index
-    "house_price_index": {
-        "file": county_base_dir / "housing_house_price_index.csv",
-        "value_col": "house_price_index",
-        "title": "All-Transactions House Price Index by County",
-        "yaxis_title": "House Price Index (Index, 2017=100)",
-    },
-    # 5) Zillow home value index
-    "zillow_hvi": {
-        "file": county_base_dir / "housing_zillow_home_value_index.csv",
-        "value_col": "zillow_home_value_index",
-        "title": "Zillow Home Value Index (All Homes) by County",
-        "yaxis_title": "Home Value Index (USD)",
-    },
-}
-
-def make_housing_figure(metric_key: str):
-    """
-    Create a county-level housing Plotly line chart for the given metric_key.
-
-    metric_key must be one of housing_metrics.keys().
-    CSVs are expected to have at least: 'date', 'county_name', and value_col.
-    """
-    cfg = housing_metrics[metric_key]
-    df = pd.read_csv(cfg["file"])
-
-    # Adjust these column names if yours are slightly different
-    # e.g. 'observation_date' instead of 'date'
-    if "date" in df.columns:
-        date_col = "date"
-    elif "observation_date" in df.columns:
-        date_col = "observation_date"
-    else:
-        raise ValueError("Could not find a date column in housing CSV")
-
-    df[date_col] = pd.to_datetime(df[date_col])
-
-    fig = px.line(
-        df,
-        x=date_col,
-        y=cfg["value_col"],
-        color="county_name",
-        title=cfg["title"],
-        labels={
-            date_col: "Date",
-            cfg["value_col"]: cfg["yaxis_title"],
-            "county_name": "County",
-        },
-    )
-
-    # Match style of your labor/econ figures
-    fig.update_layout(
-        hovermode="x unified",
-        legend_title_text="County",
-        margin=dict(l=40, r=10, t=80, b=40),
-    )
-
-    # Optional: tweak hover text to be clean
-    fig.update_traces(
-        hovertemplate="<b>%{customdata}</b><br>Date: %{x|%Y-%m-%d}<br>"
-                      + f"{cfg['yaxis_title']}: %{y:,}<extra></extra>",
-        customdata=df["county_name"],
+@interact(county=Dropdown(options=county_options, description="County:"))
+def show_labor(county):
+    update_metric_widget(
+        labor_fig,
+        get_labor_data_for_county(county),
+        f"Labor Indicators Over Time – {county}",
+        lambda m: LABOR_LABELS.get(m, m),
     )
 
-    return fig
-
-
-# In[37]:
-
-
-fig_active = make_housing_figure("active_listing_count")
-fig_active.show()
-
-fig_median_price = make_housing_figure("median_listing_price")
-fig_median_price.show()
-
-fig_units = make_housing_figure("new_private_units")
-fig_units.show()
-
-fig_hpi = make_housing_figure("house_price_index")
-fig_hpi.show()
-
-fig_zillow = make_housing_figure("zillow_hvi")
-fig_zillow.show()
+if HAVE_FIGURE_WIDGET:
+    display(labor_fig)
 
 
 # In[38]:
@@ -977,6 +1163,12 @@ housing_metric_configs = {
     },
 }
 
+# Resolve each metric's county CSVs once, from the county listing built earlier
+_HOUSING_FILES = {
+    key: [p for p in county_csv_paths if os.path.basename(p).endswith(cfg["file_suffix"])]
+    for key, cfg in housing_metric_configs.items()
+}
+
 
 def make_housing_figure(metric_key: str):
     """
@@ -995,15 +1187,21 @@ def make_housing_figure(metric_key: str):
     cfg = housing_metric_configs[metric_key]
     suffix = cfg["file_suffix"]
 
-    # Find all county CSVs for this metric
-    files = list(county_base_dir.rglob(f"*{suffix}"))
+    # County CSVs for this metric (resolved once above)
+    files = _HOUSING_FILES[metric_key]
     if not files:
         raise FileNotFoundError(f"No files found under {county_base_dir} matching *{suffix}")
 
+    # Parse county from folder name (e.g., 'prince_georges' -> 'Prince Georges')
+    county_names = [folder_to_pretty_name(os.path.basename(os.path.dirname(p))) for p in files]
+    # Shared categories, so each file's county column is just integer codes and concat stays categorical
+    all_counties = sorted(set(county_names))
+    county_codes = {name: code for code, name in enumerate(all_counties)}
+
     frames = []
 
-    for path in files:
-        df = pd.read_csv(path)
+    for path, county_name in zip(files, county_names):
+        df = read_frame(path)
 
         # Guess date + value columns robustly
         # 1) date column = first col whose name contains 'date'
@@ -1021,21 +1219,18 @@ def make_housing_figure(metric_key: str):
         else:
             value_col = numeric_cols[-1]
 
-        # Parse county from folder name (e.g., 'prince_georges' -> 'Prince Georges')
-        county_raw = path.parent.name
-        county_name = county_raw.replace("_", " ").title()
-
-        temp = pd.DataFrame({
-            "date": pd.to_datetime(df[date_col]),
-            "value": df[value_col],
-            "county_name": county_name,
-        })
+        temp = df.loc[:, [date_col, value_col]].rename(columns={date_col: "date", value_col: "value"})
+        temp["date"] = pd.to_datetime(temp["date"], format="ISO8601", cache=True)
+        temp["county_name"] = pd.Categorical.from_codes(
+            np.full(len(temp), county_codes[county_name]), categories=all_counties
+        )
         frames.append(temp)
 
-    all_data = pd.concat(frames, ignore_index=True).sort_values("date")
+    all_data = concat_frames(frames).sort_values("date")
 
     fig = px.line(
         all_data,
+        render_mode="webgl",
         x="date",
         y="value",
         color="county_name",
@@ -5,8 +5,6 @@
 import requests
 import json
 import prettytable
-import csv 
-from datetime import datetime
 import pandas as pd
 from fredapi import Fred
 import os
@@ -14,6 +12,20 @@ import yaml
 import re
 import time
 from urllib.error import HTTPError
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import importlib.util
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Faster JSON encode/decode for the API payloads when orjson is installed
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps  # returns bytes, which requests sends as-is
+except ImportError:
+    print("[INFO] orjson not installed; using the standard json module.")
+    json_loads = json.loads
+    json_dumps = json.dumps
 
 # ------------------------------- #
 # Access BLS API with unique key #
@@ -33,11 +45,17 @@ BLS_API_KEY = keys["bls_api"]
 
 SLEEP_TIME = 0.5  
 MAX_RETRIES = 3   
+RATE_PER_MINUTE = 60  # ceiling on request starts; SLEEP_TIME still spaces them out
 
 # ------------------------------- #
 # Helper Function for File Naming #
 # ------------------------------- #
 
+# Compile patterns once so each call skips the regex cache lookup
+_RE_SEP = re.compile(r"[ /\\\-]")
+_RE_NON = re.compile(r"[^a-z0-9_]")
+_RE_MULTI = re.compile(r"_+")
+
 def to_snake_case(s):
     """
     Convert a string to snake_case suitable for filenames:
@@ -47,9 +65,9 @@ def to_snake_case(s):
     - collapse multiple underscores
     """
     s = s.lower()
-    s = re.sub(r"[ /\\\-]", "_", s)
-    s = re.sub(r"[^a-z0-9_]", "", s)
-    s = re.sub(r"_+", "_", s)
+    s = _RE_SEP.sub("_", s)
+    s = _RE_NON.sub("", s)
+    s = _RE_MULTI.sub("_", s)
     s = s.strip("_")
     return s
 
@@ -63,19 +81,29 @@ month_lookup = {
     "M09": "September", "M10": "October", "M11": "November", "M12": "December"
 }
 
-def make_date(year, period):
-    if period.startswith("M"):
-        month = int(period[1:])
-        return datetime(int(year), month, 1).strftime("%Y-%m-%d")
-    return None
-
 # -------------------------------- #
 # Loading Data with Series ID Info #
 # -------------------------------- #
 
 file_path = "Indicators Series ID List.xlsx" 
 county_sheet = "COUNTY BLS" 
-county_series_id_df = pd.read_excel(file_path, sheet_name=f"{county_sheet}", skiprows=0)
+
+# Cache the sheet as Parquet so later runs skip the XLSX parse (refreshed whenever the workbook changes)
+# Uses the Rust-backed calamine reader when python-calamine is installed, openpyxl otherwise
+series_id_cache = "indicators_series_id_county_bls.parquet"
+have_parquet = importlib.util.find_spec("pyarrow") is not None
+excel_engine = "calamine" if importlib.util.find_spec("python_calamine") is not None else None
+
+if (
+    have_parquet
+    and os.path.exists(series_id_cache)
+    and os.path.getmtime(series_id_cache) >= os.path.getmtime(file_path)
+):
+    county_series_id_df = pd.read_parquet(series_id_cache)
+else:
+    county_series_id_df = pd.read_excel(file_path, sheet_name=f"{county_sheet}", skiprows=0, engine=excel_engine)
+    if have_parquet:
+        county_series_id_df.to_parquet(series_id_cache, index=False)
 
 new_col_names = ['COUNTY', 'SERIES ID']
 county_series_id_df.columns = new_col_names
@@ -97,27 +125,29 @@ county_series_id_df.loc[county_series_id_df['COUNTY'] == 'Baltimore City', 'SERI
 
 # 3. Generate IDs for the other metrics automatically
 # BLS codes: 05=Employment, 04=Unemployment Count, 03=Unemployment Rate, 06=Labor Force
-county_series_id_df['Unemployment Count ID'] = county_series_id_df['SERIES ID'].str.replace('05$', '04', regex=True)
-county_series_id_df['Unemployment Rate ID']  = county_series_id_df['SERIES ID'].str.replace('05$', '03', regex=True)
-county_series_id_df['Labor Force ID']        = county_series_id_df['SERIES ID'].str.replace('05$', '06', regex=True)
-
-# 4. "Melt" the dataframe
+#    The measure code is always the last two characters (every Employment ID ends in 05),
+#    so slice it off once and append the other codes -- no regex needed
+series_id_base = county_series_id_df['SERIES ID'].str.slice(0, -2)
+county_series_id_df['Unemployment Count ID'] = series_id_base + '04'
+county_series_id_df['Unemployment Rate ID']  = series_id_base + '03'
+county_series_id_df['Labor Force ID']        = series_id_base + '06'
+
+# 4. Reshape to long form
 # Transforms the table so every row is a single Series ID.
-county_series_melted = county_series_id_df.melt(
-    id_vars=['COUNTY'], 
-    value_vars=['SERIES ID', 'Unemployment Count ID', 'Unemployment Rate ID', 'Labor Force ID'],
-    var_name='Metric', 
-    value_name='Series ID'
-)
-
-# Clean up Metric names
+# Metric columns are renamed to their readable names first, so stacking yields them directly
 metric_map = {
     'SERIES ID': 'Employment',
     'Unemployment Count ID': 'Unemployment Count',
     'Unemployment Rate ID': 'Unemployment Rate',
     'Labor Force ID': 'Labor Force'
 }
-county_series_melted['Metric'] = county_series_melted['Metric'].map(metric_map)
+county_series_melted = (
+    county_series_id_df.set_index('COUNTY')[list(metric_map)]
+    .rename(columns=metric_map)
+    .stack(future_stack=True)
+    .rename_axis(['COUNTY', 'Metric'])
+    .reset_index(name='Series ID')
+)
 
 print("--- Ready for API ---")
 print(county_series_melted.head())
@@ -149,94 +179,162 @@ print(f"[INFO] Saving files to: {separate_dir}")
 
 # =============================================================================
 # [MODIFICATION START] - Filename Mapping & Batched Request Loop
-# Reason: The API fails if we send 96 IDs at once (Limit is ~25-50).
+# Reason: The API fails if we send 96 IDs at once (Limit is 25, or 50 with a registration key).
 # We also want files named "allegany_employment.csv", not "LAUCN....csv".
 # =============================================================================
 
 # 1. Create a "Map" for renaming files to human-readable format
-id_to_filename = {}
-for index, row in county_series_melted.iterrows():
-    clean_county = to_snake_case(row['COUNTY'])
-    clean_metric = to_snake_case(row['Metric'])
-    friendly_name = f"{clean_county}_{clean_metric}"
-    id_to_filename[row['Series ID']] = friendly_name
+#    (plus series ID -> (county, metric), used to build the merged county files in memory)
+#    snake_case runs once per unique county/metric name, then .map() applies it column-wise
+county_snake_map = {c: to_snake_case(c) for c in county_series_melted['COUNTY'].unique()}
+metric_snake_map = {m: to_snake_case(m) for m in metric_map.values()}  # only 4 metrics
+
+clean_counties = county_series_melted['COUNTY'].map(county_snake_map)
+friendly_names = clean_counties + "_" + county_series_melted['Metric'].map(metric_snake_map)
+
+series_ids = county_series_melted['Series ID'].to_numpy()
+id_to_filename = dict(zip(series_ids, friendly_names.to_numpy()))
+id_to_meta = dict(zip(series_ids, zip(clean_counties.to_numpy(), county_series_melted['Metric'].to_numpy())))
 
 # 2. Get the full list of IDs
 all_series_ids = county_series_melted['Series ID'].unique().tolist()
 
 # 3. Process in chunks
-chunk_size = 25
+# With a registration key the v2 API accepts up to 50 series per request (25 without one)
+chunk_size = 50
+max_workers = 4  # batches in flight at once
+BLS_URL = 'https://api.bls.gov/publicAPI/v2/timeseries/data/'
+BLS_HEADERS = {'Content-type': 'application/json'}
 print(f"[INFO] Starting download for {len(all_series_ids)} series in batches...")
 
-# Loop through the IDs in batches
-for i in range(0, len(all_series_ids), chunk_size):
-    current_chunk = all_series_ids[i : i + chunk_size]
-    print(f"  > Processing batch {i//chunk_size + 1} ({len(current_chunk)} IDs)...")
-
-    headers = {'Content-type': 'application/json'}
-    
+def fetch_batch(session, current_chunk, batch_num):
+    """
+    POST one batch of series IDs and return the parsed JSON (None if the batch failed).
+    """
     # Use the dynamic chunk of IDs
     data = {
-        "seriesid": current_chunk, 
+        "seriesid": current_chunk,
         "startyear": "2011",
-        "endyear": "2014"
+        "endyear": "2014",
+        "registrationkey": BLS_API_KEY
     }
 
     try:
-        response = requests.post(
-            'https://api.bls.gov/publicAPI/v2/timeseries/data/',
-            data=json.dumps(data),
-            headers=headers
-        )
-        json_data = response.json()
-        
+        response = session.post(BLS_URL, data=json_dumps(data), headers=BLS_HEADERS, timeout=30)
+        json_data = json_loads(response.content)
+
         if json_data.get('status') == 'REQUEST_NOT_PROCESSED':
-            print(f"    [ERROR] Batch failed: {json_data.get('message')}")
-            continue
+            print(f"    [ERROR] Batch {batch_num} failed: {json_data.get('message')}")
+            return None
 
     except Exception as e:
-        print(f"    [ERROR] Request failed: {e}")
-        continue
+        print(f"    [ERROR] Batch {batch_num} request failed: {e}")
+        return None
+
+    return json_data
 
-    # ---- Write CSVs for this chunk ----
+# Long-form (county, metric, date, value) frames kept from each series for the merge step
+all_series_frames = []
+
+def write_series_csvs(json_data):
+    """
+    Write one CSV per series in a BLS response, named via id_to_filename,
+    and keep its date/value rows in all_series_frames for the merge step.
+    """
     if 'Results' in json_data and 'series' in json_data['Results']:
         for series in json_data['Results']['series']:
-            
+
             series_id = series['seriesID']
-            
+
             # Use the dictionary to find the readable name
             filename_base = id_to_filename.get(series_id, series_id)
             filepath = os.path.join(separate_dir, f"{filename_base}.csv")
 
-            with open(filepath, "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow(["series_id", "year", "month", "date", "value", "footnotes"])
+            # Build the whole series as one frame and write it in one to_csv call
+            df = pd.DataFrame(series["data"], columns=["year", "period", "value", "footnotes"])
+            # Monthly observations only (M01-M12; M13 annual averages have no calendar month)
+            df = df[df["period"].isin(month_lookup.keys())].copy()
+
+            df["series_id"] = series_id
+            df["month"] = df["period"].map(month_lookup)
+            # Dates for the whole series in one vectorized parse ("2014" + "03" -> 2014-03-01)
+            df["date"] = pd.to_datetime(
+                df["year"] + df["period"].str.slice(1), format="%Y%m"
+            ).dt.strftime("%Y-%m-%d")
+            # Footnotes are lists of dicts, so the join stays per row
+            df["footnotes"] = [
+                ",".join(fn["text"] for fn in fns if fn) if isinstance(fns, list) else ""
+                for fns in df["footnotes"]
+            ]
+
+            df[["series_id", "year", "month", "date", "value", "footnotes"]].to_csv(filepath, index=False)
+
+            if series_id in id_to_meta:
+                county_name, metric_col = id_to_meta[series_id]
+                all_series_frames.append(pd.DataFrame({
+                    "county": county_name,
+                    "metric": metric_col,
+                    "date": df["date"],
+                    "value": pd.to_numeric(df["value"], errors="coerce"),
+                }))
 
-                for item in series["data"]:
-                    year = item.get("year")
-                    period = item["period"]
+            print(f"    [SAVED] {filename_base}.csv")
+
+def make_rate_limiter(rate_per_minute, min_interval):
+    """
+    Token bucket: allows bursts up to `rate_per_minute` per minute, with at least
+    `min_interval` seconds between calls. Returns a function that blocks until a token is free.
+    """
+    capacity = float(rate_per_minute)
+    refill_per_sec = rate_per_minute / 60.0
+    state = {"tokens": capacity, "last": time.monotonic(), "prev_call": 0.0}
+
+    def acquire():
+        while True:
+            now = time.monotonic()
+            state["tokens"] = min(capacity, state["tokens"] + (now - state["last"]) * refill_per_sec)
+            state["last"] = now
+            wait = max(
+                (1 - state["tokens"]) / refill_per_sec if state["tokens"] < 1 else 0.0,
+                state["prev_call"] + min_interval - now,
+            )
+            if wait <= 0:
+                state["tokens"] -= 1
+                state["prev_call"] = now
+                return
+            time.sleep(wait)
+
+    return acquire
+
+# One Session reuses pooled TCP/TLS connections; transient HTTP errors are retried with backoff
+session = requests.Session()
+retry = Retry(
+    total=MAX_RETRIES,
+    backoff_factor=1,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["POST"],  # BLS data requests are POSTs (read-only, safe to repeat)
+)
+adapter = HTTPAdapter(pool_connections=max_workers * 2, pool_maxsize=max_workers * 2, max_retries=retry)
+session.mount("https://", adapter)
 
-                    if period.startswith("M"):
-                        month_name = month_lookup.get(period, period)
-                        date_value = make_date(year, period)
+acquire_slot = make_rate_limiter(RATE_PER_MINUTE, SLEEP_TIME)
 
-                        footnotes = ",".join(
-                            fn["text"] for fn in item.get("footnotes", []) if fn
-                        )
+with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+    futures = []
+    for i in range(0, len(all_series_ids), chunk_size):
+        current_chunk = all_series_ids[i : i + chunk_size]
+        batch_num = i // chunk_size + 1
 
-                        writer.writerow([
-                            series_id,
-                            year,
-                            month_name,
-                            date_value,
-                            item.get("value"),
-                            footnotes
-                        ])
+        # Be nice to the API: throttle submissions
+        acquire_slot()
+        print(f"  > Processing batch {batch_num} ({len(current_chunk)} IDs)...")
+        futures.append(executor.submit(fetch_batch, session, current_chunk, batch_num))
 
-            print(f"    [SAVED] {filename_base}.csv")
-            
-    # Be nice to the API
-    time.sleep(SLEEP_TIME)
+    # ---- Write CSVs as each batch finishes ----
+    for future in as_completed(futures):
+        json_data = future.result()
+        if json_data is not None:
+            write_series_csvs(json_data)
 
 # Script completion confirmation statement
 print("[INFO] All downloads complete!")
@@ -248,78 +346,42 @@ print("[INFO] Files saved in: bls_csv_outputs/county_data/separate")
 
 print("\n[INFO] Starting merge process...")
 
-# Dictionary to store dataframes: {'allegany': [df_emp, df_unemp, ...]}
-county_dfs = {}
-
-# 1. Loop through all CSVs in the output folder
-for filename in os.listdir(separate_dir):
-    if filename.endswith(".csv"):
-        # filename example: "allegany_unemployment_rate.csv"
-        
-        # Split the filename to get the county and the metric
-        # We assume the format is always "{county}_{metric}.csv"
-        # This is a bit tricky since counties can have underscores (prince_georges)
-        # So we look at your 'county_series_melted' map to be safe, 
-        # OR we can just use string manipulation if we trust the naming convention.
-        
-        # Let's use a smarter way: parsing the filename
-        # Remove .csv
-        name_no_ext = filename.replace(".csv", "")
-        
-        # Identify the metric from the end of the string
-        if name_no_ext.endswith("_employment"):
-            county_name = name_no_ext.replace("_employment", "")
-            metric_col = "Employment"
-        elif name_no_ext.endswith("_unemployment_count"):
-            county_name = name_no_ext.replace("_unemployment_count", "")
-            metric_col = "Unemployment Count"
-        elif name_no_ext.endswith("_unemployment_rate"):
-            county_name = name_no_ext.replace("_unemployment_rate", "")
-            metric_col = "Unemployment Rate"
-        elif name_no_ext.endswith("_labor_force"):
-            county_name = name_no_ext.replace("_labor_force", "")
-            metric_col = "Labor Force"
-        else:
-            print(f"  [SKIP] Could not identify metric for: {filename}")
-            continue
-            
-        # Read the CSV
-        file_path = os.path.join(separate_dir, filename)
-        df = pd.read_csv(file_path)
-        
-        # Keep only date and value
-        df = df[['date', 'value']]
-        
-        # Rename 'value' to the specific metric (e.g., 'Unemployment Rate')
-        df = df.rename(columns={'value': metric_col})
-        
-        # Add to our dictionary
-        if county_name not in county_dfs:
-            county_dfs[county_name] = []
-        county_dfs[county_name].append(df)
-
-# 2. Merge and Save
+# 1. Pivot the downloaded series straight from memory (no re-reading of the separate CSVs)
+#    One row per (county, date), one column per metric (e.g., 'Unemployment Rate')
 merged_output_dir = os.path.join(script_dir, "bls_csv_outputs", "county_data", "merged")
 os.makedirs(merged_output_dir, exist_ok=True)
 
-for county_name, df_list in county_dfs.items():
-    if not df_list:
-        continue
-        
-    # Start with the first dataframe in the list
-    merged_df = df_list[0]
-    
-    # Merge the rest
-    for next_df in df_list[1:]:
-        merged_df = pd.merge(merged_df, next_df, on='date', how='outer')
-        
-    # Sort by date
-    merged_df = merged_df.sort_values('date')
-    
-    # Save
-    save_path = os.path.join(merged_output_dir, f"{county_name}_all_metrics.csv")
-    merged_df.to_csv(save_path, index=False)
-    print(f"  [MERGED] Saved {county_name}_all_metrics.csv")
+if all_series_frames:
+    long_df = pd.concat(all_series_frames, ignore_index=True)
+    # groupby/unstack keeps (county, date) rows whose values are all missing
+    # (pivot_table would drop them, or with dropna=False add every county x date pair)
+    wide_df = (
+        long_df.groupby(['county', 'date', 'metric'], sort=False)['value']
+        .first()
+        .unstack('metric')
+        .reset_index()
+    )
+    wide_df.columns.name = None
+
+    # Counts stay whole numbers in the CSVs (12345, not 12345.0); nullable Int64 keeps the gaps empty
+    count_metrics = [m for m in ('Employment', 'Unemployment Count', 'Labor Force') if m in wide_df.columns]
+    wide_df[count_metrics] = wide_df[count_metrics].round().astype('Int64')
+
+    # 2. Save one file per county, sorted by date
+    #    (one stable sort up front, so each group is already in date order)
+    wide_df = wide_df.sort_values(['county', 'date'], kind='stable')
+    for county_name, merged_df in wide_df.groupby('county', sort=False):
+        merged_df = merged_df.drop(columns='county')
+
+        # Save
+        save_path = os.path.join(merged_output_dir, f"{county_name}_all_metrics.csv")
+        merged_df.to_csv(save_path, index=False)
+        if have_parquet:
+            # Typed copy for tile_map.py (no date/number re-parsing on read)
+            merged_df.to_parquet(save_path.replace(".csv", ".parquet"), compression="snappy", index=False)
+        print(f"  [MERGED] Saved {county_name}_all_metrics.csv")
+else:
+    print("  [SKIP] No series were downloaded, nothing to merge.")
 
 
 # Script completion confirmation statement
@@ -13,8 +13,19 @@ import os  # File management (reading and saving)
 import yaml  # Load API key from a YAML file for security purposes
 import re  # For file naming manipulation
 import time  # To buffer API requests
+import threading  # Per-thread FRED clients and rate limiter lock
+from concurrent.futures import ThreadPoolExecutor  # Parallel series downloads
 from urllib.error import HTTPError  # Handle API request limit
 
+# Optional: pyarrow writes the partitioned Parquet copy of the county data
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+    print("[INFO] pyarrow not installed; skipping the Parquet dataset export.")
+
 # -------------------------------- #
 # Setting up for FRED API Requests #
 # -------------------------------- #
@@ -55,6 +66,11 @@ def safe_get_series(fred, series_id, retries=MAX_RETRIES):
 # Helper Function for File Naming #
 # ------------------------------- #
 
+# Compile patterns once so each call skips the regex cache lookup
+_RE_SEP = re.compile(r"[ /\\\-]")      # space, /, \, -
+_RE_NON = re.compile(r"[^a-z0-9_]")     # non-alphanumeric and non-underscore chars
+_RE_MULTI = re.compile(r"_+")           # runs of underscores
+
 # Ensure snake_case and proper naming convention
 def to_snake_case(s):
     """
@@ -65,12 +81,27 @@ def to_snake_case(s):
     - collapse multiple underscores
     """
     s = s.lower()                      # lowercase
-    s = re.sub(r"[ /\\\-]", "_", s)    # replace space, /, \, - with _
-    s = re.sub(r"[^a-z0-9_]", "", s)   # remove all non-alphanumeric and non-underscore chars
-    s = re.sub(r"_+", "_", s)          # collapse multiple underscores
+    s = _RE_SEP.sub("_", s)            # replace space, /, \, - with _
+    s = _RE_NON.sub("", s)             # remove all non-alphanumeric and non-underscore chars
+    s = _RE_MULTI.sub("_", s)          # collapse multiple underscores
     s = s.strip("_")                    # remove leading/trailing underscores
     return s
 
+# ------------------------------ #
+# Helper Function for CSV Output #
+# ------------------------------ #
+
+def write_series_csv(data, out_path):
+    """
+    Save a FRED series as a two-column CSV (date, value).
+    """
+    # Convert Series to DataFrame with generic column names
+        # X-axis label
+    df = data.to_frame(name="value")
+        # Y-axis label
+    df.index.name = "date"
+    df.to_csv(out_path, header=True)
+
 # ------------------------------- #
 # Access FRED API with unique key #
 # ------------------------------- #
@@ -147,7 +178,104 @@ print(f"[INFO] State output folder created: {state_output_folder}")
 # Change to "county_series_id_df" later
 #montgomery_df = county_series_id_df[county_series_id_df["COUNTY"] == "Montgomery"]
 
-# Iterate through counties and series
+# --------------------------------- #
+# Threaded Fetching with Throttling #
+# --------------------------------- #
+
+# fredapi's Fred object is not thread-safe, so each worker thread gets its own
+_thread_local = threading.local()
+
+def get_thread_fred():
+    """Return a Fred client owned by the current thread (created on first use)."""
+    client = getattr(_thread_local, "fred", None)
+    if client is None:
+        client = Fred(api_key=FRED_API_KEY)
+        _thread_local.fred = client
+    return client
+
+def make_rate_limiter(rate_per_minute, burst=1):
+    """
+    Thread-safe token bucket: `rate_per_minute` calls per minute, bursts of at most `burst`.
+    The bucket starts with `burst` tokens (not a full minute's worth), so no 60 s window
+    sees more than rate_per_minute + burst calls.
+    Returns a function that blocks until a token is free.
+    """
+    capacity = float(burst)
+    refill_per_sec = rate_per_minute / 60.0
+    state = {"tokens": capacity, "last": time.monotonic()}
+    lock = threading.Lock()
+
+    def acquire():
+        while True:
+            with lock:
+                now = time.monotonic()
+                state["tokens"] = min(capacity, state["tokens"] + (now - state["last"]) * refill_per_sec)
+                state["last"] = now
+                if state["tokens"] >= 1:
+                    state["tokens"] -= 1
+                    return
+                wait = (1 - state["tokens"]) / refill_per_sec
+            time.sleep(wait)
+
+    return acquire
+
+# FRED allows 120 requests per minute per API key
+FRED_RATE_PER_MINUTE = 120
+MAX_WORKERS = 8
+acquire_slot = make_rate_limiter(FRED_RATE_PER_MINUTE)
+
+# Metadata fields requested for every series
+calls = ["title", "source_name", "frequency_short", "observation_start", "observation_end"]
+
+def fetch_one(task):
+    """
+    Fetch metadata and observations for one (county, col, series_id) task.
+    Returns (task, metadata, data); data is None if the series could not be fetched.
+    """
+    county, col, series_id = task
+    fred_client = get_thread_fred()
+
+    # ---------------------
+    # Fetch metadata
+    # ---------------------
+    metadata = [None] * len(calls)  # Default is None
+    try:
+        acquire_slot()
+        meta = safe_get_series_info(fred_client, series_id)
+        metadata = [meta.get(element, None) for element in calls]
+    except Exception as e:
+        print(f"[WARN] Could not fetch metadata for {series_id}: {e}. Skipping metadata.")
+
+    # -------------------------
+    # Fetch series with exponential backoff
+    # -------------------------
+    retries = 0
+    max_retries = 8
+    wait_seconds = 10  # Initial wait time for exponential backoff
+    data = None
+
+    while retries < max_retries:
+        try:
+            acquire_slot()
+            data = safe_get_series(fred_client, series_id)
+            break  # Success, exit retry loop
+        except HTTPError as e:
+            if e.code == 429:
+                retries += 1
+                print(f"[WARN] Rate limit hit for {series_id}. Waiting {wait_seconds} seconds before retry {retries}/{max_retries}...")
+                time.sleep(wait_seconds)
+                wait_seconds *= 2  # Exponential backoff
+            else:
+                print(f"[ERROR] HTTPError for {series_id}: {e}. Skipping.")
+                break
+        except Exception as e:
+            print(f"[ERROR] Unexpected error for {series_id}: {e}. Skipping.")
+            break
+
+    return task, metadata, data
+
+# Build a flat task list of every (county, column, series ID) to download
+tasks = []
 for idx, row in county_series_id_df.iterrows():
     county = row["COUNTY"]
 
@@ -159,55 +287,31 @@ for idx, row in county_series_id_df.iterrows():
         series_id = row[col]
         if pd.isna(series_id) or series_id == "":  # Skips blanks
             continue
+        tasks.append((county, col, series_id))
 
-        # Prepare file path
-        county_snake_case = to_snake_case(county)
-        col_snake_case = to_snake_case(col)
-        out_path = os.path.join(county_folder, f"{county_snake_case}_{col_snake_case}.csv")
-
-        # -------------------------------------------------------
-        # LEAVE THIS SECTION COMMENTED OUT (unless special case)
-        # -------------------------------------------------------
-
-        # This will will make it so it executres calls for data that hasn't already been saved
-            # Can be helpful if going over request limit
-            # Skips calling for data if it was previously downloaded
-            # Caution: It is wise to keep this commented-out so old downloaded data can be overwritten
-        #if os.path.exists(out_path):
-        #    print(f"[INFO] File already exists, skipping: {os.path.relpath(out_path)}\n")
-        #    continue
-
-        # ---------------------
-        # Fetch metadata
-        # ---------------------
-        
-        # Sets default values to None
-        title = source = freq = obs_start = obs_end = None
+print(f"[INFO] Fetching {len(tasks)} county series with {MAX_WORKERS} workers...")
 
-        try:
-            meta = fred.get_series_info(series_id)
-        except Exception as e:
-            print(f"[WARN] Could not fetch metadata for {series_id}: {e}. Skipping metadata.")
-        
-        calls = ["title", "source_name", "frequency_short", "observation_start", "observation_end"]
-        metadata = []
-    
-        for element in calls:
-            
-            x = None  # Default is None
+# -------------------------------------------------------
+# LEAVE THIS SECTION COMMENTED OUT (unless special case)
+# -------------------------------------------------------
 
-            try:
-                x = meta.get(element, None)
-            except Exception as e:
-                print(f"[WARN] Could not fetch metadata for {element}: {e}. Skipping metadata.")
+# This will will make it so it executres calls for data that hasn't already been saved
+    # Can be helpful if going over request limit
+    # Skips calling for data if it was previously downloaded
+    # Caution: It is wise to keep this commented-out so old downloaded data can be overwritten
+#tasks = [
+#    t for t in tasks
+#    if not os.path.exists(os.path.join(county_output_base, to_snake_case(t[0]),
+#                                       f"{to_snake_case(t[0])}_{to_snake_case(t[1])}.csv"))
+#]
 
-            metadata.append(x)
+# Long-format frames (county, metric, series_id, date, value) for the Parquet dataset
+county_long_frames = []
 
-        title = metadata[0]  # Data from calls[0]
-        source = metadata[1]
-        freq = metadata[2]
-        obs_start = metadata[3]
-        obs_end = metadata[4]
+# Results come back in task order, so printouts match the serial version
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+    for (county, col, series_id), metadata, data in executor.map(fetch_one, tasks):
+        title, source, freq, obs_start, obs_end = metadata
 
         # Print metadata confirmation
         print(f"County: {county} | Series: {col} ({series_id})")
@@ -218,32 +322,6 @@ for idx, row in county_series_id_df.iterrows():
         print(f"Observation End: {obs_end}")
         print("-"*50)
 
-        # -------------------------
-        # Fetch series with exponential backoff
-        # -------------------------
-        retries = 0
-        max_retries = 8
-        wait_seconds = 10  # Initial wait time for exponential backoff
-
-        while retries < max_retries:
-            try:
-                data = fred.get_series(series_id)
-                break  # Success, exit retry loop
-            except HTTPError as e:
-                if e.code == 429:
-                    retries += 1
-                    print(f"[WARN] Rate limit hit for {series_id}. Waiting {wait_seconds} seconds before retry {retries}/{max_retries}...")
-                    time.sleep(wait_seconds)
-                    wait_seconds *= 2  # Exponential backoff
-                else:
-                    print(f"[ERROR] HTTPError for {series_id}: {e}. Skipping.")
-                    data = None
-                    break
-            except Exception as e:
-                print(f"[ERROR] Unexpected error for {series_id}: {e}. Skipping.")
-                data = None
-                break
-
         if data is None:
             print(f"[ERROR] Could not fetch series {series_id}. Skipping.\n")
             continue
@@ -253,20 +331,42 @@ for idx, row in county_series_id_df.iterrows():
         # -------------------------
         county_snake_case = to_snake_case(county)
         col_snake_case = to_snake_case(col)
+        county_folder = os.path.join(county_output_base, county_snake_case)
         out_path = os.path.join(county_folder,f"{county_snake_case}_{col_snake_case}.csv")
         
-        # Convert Series to DataFrame with generic column names
-            # X-axis label
-        df = data.to_frame(name="value")
-            # Y-axis label
-        df.index.name = "date"
-        
-        df.to_csv(out_path, header=True)
+        write_series_csv(data, out_path)
         relative_path = os.path.relpath(out_path, start=os.getcwd())
         print(f"[INFO] File saved to:\n{relative_path}\n")
 
-         # Short sleep to spread requests and reduce hitting rate limit
-        time.sleep(0.75)  # Could change to anywhere from 0.25 or 0.75
+        county_long_frames.append(pd.DataFrame({
+            "county": county_snake_case,
+            "metric": col_snake_case,
+            "series_id": series_id,
+            "date": data.index,
+            "value": data.to_numpy(),
+        }))
+
+# ------------------------------------------ #
+# Save all county series as a Parquet dataset #
+# ------------------------------------------ #
+
+# One hive-partitioned dataset (county=<name>/metric=<name>/...) for bulk reads;
+# the per-series CSVs above remain the format the dashboards consume
+county_parquet_root = os.path.join(script_dir, "fred_parquet", "county_data")
+
+if HAVE_PYARROW and county_long_frames:
+    county_long_df = pd.concat(county_long_frames, ignore_index=True)
+    ds.write_dataset(
+        pa.Table.from_pandas(county_long_df, preserve_index=False),
+        county_parquet_root,
+        format="parquet",
+        partitioning=ds.partitioning(
+            pa.schema([("county", pa.string()), ("metric", pa.string())]),
+            flavor="hive",
+        ),
+        existing_data_behavior="delete_matching",
+    )
+    print(f"[INFO] County Parquet dataset saved to:\n{os.path.relpath(county_parquet_root, start=os.getcwd())}\n")
 
 
 #################################################
@@ -319,13 +419,7 @@ for idx, row in state_series_id_df.iterrows():
     series_snake_case = to_snake_case(series_name)
     out_path = os.path.join(state_output_folder, f"{series_snake_case}.csv")
     
-    # Convert Series to DataFrame with generic column names
-        # X-axis label
-    df = data.to_frame(name="value")
-        # Y-axis label
-    df.index.name = "date"
-    
-    df.to_csv(out_path, header=True)
+    write_series_csv(data, out_path)
 
     # Print relative path confirmation
     relative_path = os.path.relpath(out_path, start=os.getcwd())
@@ -23,9 +23,14 @@
 # ---------------------------------------- #
 import os
 import re
+import importlib.util
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from urllib.error import HTTPError
 
+import numpy as np
 import pandas as pd
 from fredapi import Fred
 import yaml
@@ -39,6 +44,14 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+# Optional: downsample long series (LTTB) so zoom/pan stays responsive with many metrics x years
+# mode="auto" wraps every figure (go.Figure/make_subplots) once it has enough points
+try:
+    from plotly_resampler import register_plotly_resampler
+    register_plotly_resampler(mode="auto")
+except ImportError:
+    print("[INFO] plotly-resampler not installed; figures will plot every point. Install with: pip install plotly-resampler")
+
 # ------------------------------------------- #
 # Ensure Current Working Directory is correct #
 # ------------------------------------------- #
@@ -59,7 +72,14 @@ print("County-Level:", county_base_dir.exists(), county_base_dir.is_dir())
 # Helper Function for File Naming #
 # ------------------------------- #
 
+# Compile patterns once so each call skips the regex cache lookup
+_RE_SEP = re.compile(r"[ /\\\-]")      # space, /, \, -
+_RE_NON = re.compile(r"[^a-z0-9_]")     # non-alphanumeric and non-underscore chars
+_RE_MULTI = re.compile(r"_+")           # runs of underscores
+
 # Ensure snake_case and proper naming convention
+# (memoized: only a few dozen distinct county/sheet names ever come through here)
+@lru_cache(maxsize=None)
 def to_snake_case(s):
     """
     Convert a string to snake_case suitable for filenames:
@@ -69,23 +89,102 @@ def to_snake_case(s):
     - collapse multiple underscores
     """
     s = s.lower()                      # lowercase
-    s = re.sub(r"[ /\\\-]", "_", s)    # replace space, /, \, - with _
-    s = re.sub(r"[^a-z0-9_]", "", s)   # remove all non-alphanumeric and non-underscore chars
-    s = re.sub(r"_+", "_", s)          # collapse multiple underscores
+    s = _RE_SEP.sub("_", s)            # replace space, /, \, - with _
+    s = _RE_NON.sub("", s)             # remove all non-alphanumeric and non-underscore chars
+    s = _RE_MULTI.sub("_", s)          # collapse multiple underscores
     s = s.strip("_")                    # remove leading/trailing underscores
     return s
 
+# --------------------------------- #
+# Helper Function for CSV Discovery #
+# --------------------------------- #
+
+def list_csvs(base):
+    """
+    Recursively collect every .csv under `base` as Path objects.
+    Uses os.scandir so each directory is read once, with no stat() per entry.
+    """
+    out = []
+    stack = [str(base)]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".csv"):
+                        out.append(Path(entry.path))
+        except FileNotFoundError:
+            continue  # base folder hasn't been created yet
+    return out
+
+# ------------------------------------ #
+# Helper Functions for Metric Grouping #
+# ------------------------------------ #
+
+def combine_group_patterns(group_patterns):
+    """
+    Join a {group: compiled pattern} dict into one regex with a named group per group.
+    Each branch is an anchored lookahead, so branches are tried in dict order and
+    the first group that matches anywhere in the metric wins (same as trying them one by one).
+    """
+    return re.compile(
+        "|".join(f"^(?=.*?(?P<{group}>{pattern.pattern}))" for group, pattern in group_patterns.items()),
+        re.IGNORECASE,
+    )
+
+def classify_metrics(metric_list, group_re):
+    """
+    Assign each metric to a group with a single search of the combined regex.
+    Returns {group: [metrics]}; metrics that match no group are dropped.
+    """
+    grouped = {group: [] for group in group_re.groupindex}  # named groups, in pattern order
+    for metric in metric_list:
+        match = group_re.search(metric)
+        if match:
+            grouped[match.lastgroup].append(metric)
+    return grouped
+
+# Walk each output tree once; every file map below is derived from these lists
+county_csv_files = list_csvs(county_base_dir)
+state_csv_files = list_csvs(state_base_dir)
+
 # -------------------------------- #
 # Loading Data with Series ID Info #
 # -------------------------------- #
 
+# Cache each sheet as Parquet so later runs skip the XLSX parse (refreshed whenever the workbook changes)
+# Uses the Rust-backed calamine reader when python-calamine is installed, openpyxl otherwise
+have_parquet = importlib.util.find_spec("pyarrow") is not None
+excel_engine = "calamine" if importlib.util.find_spec("python_calamine") is not None else None
+
+def read_excel_cached(path, sheet_name, **kwargs):
+    """
+    pd.read_excel with a Parquet sidecar per sheet, e.g.
+    'COUNTY FRED' -> indicators_series_id_county_fred.parquet
+    """
+    cache_path = f"indicators_series_id_{to_snake_case(sheet_name)}.parquet"
+
+    if (
+        have_parquet
+        and os.path.exists(cache_path)
+        and os.path.getmtime(cache_path) >= os.path.getmtime(path)
+    ):
+        return pd.read_parquet(cache_path)
+
+    df = pd.read_excel(path, sheet_name=sheet_name, engine=excel_engine, **kwargs)
+    if have_parquet:
+        df.to_parquet(cache_path, index=False, compression="zstd")
+    return df
+
 # Load table with series IDs that is downloaded from Google Drive
 file_path = "Indicators Series ID List.xlsx"  # Can be updated if Excel file changes
 
 # County Series IDs
 county_sheet = "COUNTY FRED"  # Can be updated if Excel file changes
     # Read  Excel file -- Note: Skipping first row, since column headings are merged in row 0
-county_series_id_df = pd.read_excel(file_path, sheet_name=f"{county_sheet}", skiprows=1)
+county_series_id_df = read_excel_cached(file_path, county_sheet, skiprows=1)
 
 # Clean the COUNTY column (for any extra spaces) - must match FRED API County Names
 county_series_id_df["COUNTY"] = county_series_id_df["COUNTY"].astype(str).str.strip()
@@ -93,7 +192,7 @@ county_series_id_df["COUNTY"] = county_series_id_df["COUNTY"].astype(str).str.st
 # State of Maryland Series IDs
 state_sheet = "MD FRED"  # Can be updated if Excel file changes
     # Read  Excel file
-state_series_id_df = pd.read_excel(file_path, sheet_name=f"{state_sheet}")
+state_series_id_df = read_excel_cached(file_path, state_sheet)
 
 # ------------------------------------------- #
 
@@ -121,21 +220,16 @@ for county in county_list:
 # ----------------------------------------------- #
 # Create set to store unique COUNTY-LEVEL metrics #
 # ----------------------------------------------- #
-county_metric_set = set()
-
-for file in county_base_dir.rglob("*.csv"):
-    folder_lower = file.parent.name.lower()
-    
-    # Only include counties in your list
-    if folder_lower in county_list_snake:
-        # Get filename without extension
-        name_only = file.stem  # e.g., "baltimore_city_resident_population"
-        
-        # Ensure we only remove the **exact folder name prefix**
-        prefix = folder_lower + "_"
-        if name_only.startswith(prefix):
-            metric = name_only[len(prefix):]  # remove the prefix safely
-            county_metric_set.add(metric)
+# Set for O(1) "is this one of our counties?" checks
+county_set = set(county_list_snake)
+
+# Only include counties in your list, and only remove the **exact folder name prefix**
+# e.g., "baltimore_city/baltimore_city_resident_population.csv" -> "resident_population"
+county_metric_set = {
+    file.stem[len(folder) + 1:]
+    for file in county_csv_files
+    if (folder := file.parent.name.lower()) in county_set and file.stem.startswith(folder + "_")
+}
 
 # Convert to a sorted list
 county_metric_list = sorted(list(county_metric_set))
@@ -151,14 +245,8 @@ group_county_patterns = {
     "economy": re.compile(r"poverty|gdp|population", re.IGNORECASE)
 }
 
-# --- Assign metrics to groups ---
-grouped_county_metrics = {group: [] for group in group_county_patterns.keys()}
-
-for metric in county_metric_list:
-    for group, pattern in group_county_patterns.items():
-        if pattern.search(metric):
-            grouped_county_metrics[group].append(metric)
-            break
+# --- Assign metrics to groups (one combined regex search per metric) ---
+grouped_county_metrics = classify_metrics(county_metric_list, combine_group_patterns(group_county_patterns))
 
 # --- Convert to a long-form DataFrame ---
 rows = []
@@ -172,35 +260,45 @@ county_metrics_df = pd.DataFrame(rows)
 # Dictionary to store COUNTY-LEVEL files by group #
 # ----------------------------------------------- #
 
+# --- Index every county CSV once: {county folder: {metric: path}} ---
+files_by_county = defaultdict(dict)
+for file in county_csv_files:
+    county = file.relative_to(county_base_dir).parts[0]  # top-level county folder
+    # Remove county prefix if present
+    metric_name = file.stem.lower().removeprefix(county + "_")
+    files_by_county[county][metric_name] = file
+
+# --- Reverse lookup: metric -> group ---
+metric_to_group = {
+    metric.lower(): group
+    for group, metrics in grouped_county_metrics.items()
+    for metric in metrics
+}
+
 # Initialize nested dictionary
 county_group_file_dict = {}
 
 # Loop through all counties in county_list_snake
 for county in county_list_snake:
-    county_dir = county_base_dir / county
-    if not county_dir.exists():
+    if county not in files_by_county and not (county_base_dir / county).exists():
         continue  # skip if folder doesn't exist
 
-    # Filter metrics by group
-    for group in ["housing", "labor", "economy"]:
-        # Get metrics in this group
-        metrics_in_group = county_metrics_df[county_metrics_df['group'] == group]['metric'].tolist()
-        
-        # Find all CSVs in the county folder that match metrics in this group
-        matching_files = []
-        for file in county_dir.rglob("*.csv"):
-            file_name = file.stem.lower()
-            # Remove county prefix if present
-            prefix = county + "_"
-            if file_name.startswith(prefix):
-                metric_name = file_name[len(prefix):]
-            else:
-                metric_name = file_name
-            if any(metric.lower() == metric_name for metric in metrics_in_group):
-                matching_files.append(file)
-        
-        # Add to nested dictionary
-        county_group_file_dict.setdefault(county, {})[group] = matching_files
+    # Route each of the county's files to its group with one dict lookup
+    county_groups = {group: [] for group in ["housing", "labor", "economy"]}
+    for metric_name, file in files_by_county.get(county, {}).items():
+        group = metric_to_group.get(metric_name)
+        if group in county_groups:
+            county_groups[group].append(file)
+
+    # Add to nested dictionary
+    county_group_file_dict[county] = county_groups
+
+# Flat (county, group) -> [csv paths] lookup, so loaders never stat() files again
+PATH_INDEX = {
+    (county, group): files
+    for county, county_groups in county_group_file_dict.items()
+    for group, files in county_groups.items()
+}
 
 # ----------------------------------------------- #
 # Display Output: Just Group and Files (no County)
@@ -242,12 +340,8 @@ for group, files in group_files_only.items():
 # ----------------------------------------------- #
 # Create set to store unique STATE-LEVEL metrics #
 # ----------------------------------------------- #
-state_metric_set = set()
-
-for file in state_base_dir.rglob("*.csv"):
-    # Get filename without extension
-    metric = file.stem  # e.g., "resident_population"
-    state_metric_set.add(metric)
+# Filename without extension, e.g., "resident_population"
+state_metric_set = {file.stem for file in state_csv_files}
 
 # Convert to a sorted list
 state_metric_list = sorted(list(state_metric_set))
@@ -264,14 +358,8 @@ group_state_patterns = {
     "economy": re.compile(r"poverty|gdp|population|income|business", re.IGNORECASE)
 }
 
-# --- Assign metrics to groups ---
-grouped_state_metrics = {group: [] for group in group_state_patterns.keys()}
-
-for metric in state_metric_list:
-    for group, pattern in group_state_patterns.items():
-        if pattern.search(metric):
-            grouped_state_metrics[group].append(metric)
-            break
+# --- Assign metrics to groups (one combined regex search per metric) ---
+grouped_state_metrics = classify_metrics(state_metric_list, combine_group_patterns(group_state_patterns))
 
 # --- Convert to a long-form DataFrame ---
 rows = []
@@ -305,7 +393,7 @@ for group in ["housing", "labor", "economy"]:
     metrics_in_group = county_metrics_df[county_metrics_df['group'] == group]['metric'].tolist()
     
     matching_files = []
-    for file in state_base_dir.rglob("*.csv"):
+    for file in state_csv_files:
         file_name = file.stem.lower()
         # Check if any metric in this group is in the filename
         if any(metric.lower() in file_name for metric in metrics_in_group):
@@ -336,37 +424,84 @@ def make_friendly_label(metric_name: str) -> str:
 # Create dictionary dynamically from county_metrics_df
 metric_label_dict = {m: make_friendly_label(m) for m in county_metrics_df["metric"].unique()}
 
+# ------------------------------------------------- #
+# Preload every COUNTY-LEVEL CSV into one DataFrame #
+# ------------------------------------------------- #
+
+# Threads overlap the file I/O; pandas' C parser releases the GIL while it reads
+IO_WORKERS = min(16, (os.cpu_count() or 1) * 4)
+
+def thread_map(fn, items) -> list:
+    items = list(items)
+    if len(items) <= 1:
+        return [fn(item) for item in items]  # not worth a pool
+    with ThreadPoolExecutor(max_workers=min(IO_WORKERS, len(items))) as ex:
+        return list(ex.map(fn, items))  # keeps input order
+
+def _read_one(task) -> pd.DataFrame:
+    """Read one county CSV and tag it with its county, group, and friendly metric label."""
+    county, group, csv_path = task
+    metric = csv_path.stem.lower().removeprefix(county + "_")
+
+    # Dates and values are typed by the C parser as it reads (no second conversion pass)
+    df = pd.read_csv(csv_path, parse_dates=["date"], dtype={"value": "float64"})
+    df["county"] = county
+    df["group"] = group
+    # Use friendly label for hover
+    df["metric"] = metric_label_dict.get(metric, metric)
+    return df
+
+def load_all_county_data() -> pd.DataFrame:
+    """
+    Read every county/group/metric CSV once into a single long-form DataFrame
+    with columns: county, group, metric, date, value.
+    """
+    tasks = [
+        (county, group, csv_path)
+        for (county, group), csv_paths in PATH_INDEX.items()
+        for csv_path in csv_paths
+    ]
+    frames = thread_map(_read_one, tasks)
+
+    if not frames:
+        return pd.DataFrame(columns=["county", "group", "metric", "date", "value"])
+
+    # Every frame has the same columns/dtypes, so concat takes its fast path (no column sort)
+    all_data = pd.concat(frames, ignore_index=True, copy=False, sort=False)
+
+    # Few distinct labels repeated on every row -> categoricals (less memory, integer-code filters)
+    for col in ["county", "group", "metric"]:
+        all_data[col] = all_data[col].astype("category")
+
+    return all_data[["county", "group", "metric", "date", "value"]]
+
+ALL_DATA = load_all_county_data()
+
 # ----------------------------------- #
 # Get Metrics Data for County + Group #
 # ----------------------------------- #
 
 def get_group_data_for_county(county_name_pretty: str, group_name: str) -> pd.DataFrame:
-    county_snake = to_snake_case(county_name_pretty)
-    county_folder = county_base_dir / county_snake
-
-    if not county_folder.exists():
-        raise FileNotFoundError(f"No folder found for county: {county_folder}")
-
-    metrics_in_group = county_metrics_df[county_metrics_df['group'] == group_name]['metric'].tolist()
-    frames = []
-
-    for metric in metrics_in_group:
-        csv_path = county_folder / f"{county_snake}_{metric}.csv"
-        if not csv_path.exists():
-            continue
+    """
+    Return the long-form (date, value, metric) data for one county and metric group.
+    Results are cached per (county, group), so repeat selections skip even the filter.
+    """
+    # Shallow copy so callers can add columns without touching the cached frame
+    return _load_group_data(to_snake_case(county_name_pretty), group_name).copy(deep=False)
 
-        df = pd.read_csv(csv_path)
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"])
+@lru_cache(maxsize=256)
+def _load_group_data(county_snake: str, group_name: str) -> pd.DataFrame:
+    if county_snake not in county_group_file_dict:
+        raise FileNotFoundError(f"No folder found for county: {county_base_dir / county_snake}")
 
-        # Use friendly label for hover
-        df["metric"] = metric_label_dict.get(metric, metric)
-        frames.append(df)
+    # Vectorized filter on the preloaded data (no disk access)
+    mask = (ALL_DATA["county"] == county_snake) & (ALL_DATA["group"] == group_name)
+    df = ALL_DATA.loc[mask, ["date", "value", "metric"]].reset_index(drop=True)
 
-    if not frames:
-        raise ValueError(f"No {group_name} metrics found for county: {county_name_pretty}")
+    if df.empty:
+        raise ValueError(f"No {group_name} metrics found for county: {county_snake}")
 
-    return pd.concat(frames, ignore_index=True)
+    return df
 
 ##############################################################
 
@@ -378,6 +513,19 @@ def get_group_data_for_county(county_name_pretty: str, group_name: str) -> pd.Da
 plotly_outputs_dir = Path("plotly_outputs")
 plotly_outputs_dir.mkdir(parents=True, exist_ok=True)  # create if doesn't exist
 
+# Values below this magnitude keep the 2 decimals shown on hover in float32 (~7 significant digits)
+FLOAT32_SAFE_MAX = 1e5
+
+def plot_values(values: pd.Series) -> np.ndarray:
+    """
+    Values to embed in a trace: float32 (half the bytes in the figure JSON) when the
+    series is small enough to keep hover precision, float64 otherwise (e.g., GDP in dollars).
+    """
+    arr = values.to_numpy(dtype="float64")
+    if arr.size and np.nanmax(np.abs(arr), initial=0.0) < FLOAT32_SAFE_MAX:
+        return arr.astype("float32")
+    return arr
+
 def create_group_figure(df, county_name, group_name):
     """
     Create a Plotly figure for all metrics in a group for a given county.
@@ -390,7 +538,9 @@ def create_group_figure(df, county_name, group_name):
     Returns:
     - Plotly Figure object
     """
-    metrics = sorted(df["metric"].unique())
+    # One groupby pass splits every metric (categorical codes, sorted by name)
+    metric_frames = list(df.groupby("metric", observed=True, sort=True))
+    metrics = [str(m) for m, _ in metric_frames]
     n_rows = len(metrics)
 
     fig = make_subplots(
@@ -398,16 +548,15 @@ def create_group_figure(df, county_name, group_name):
         subplot_titles=metrics, vertical_spacing=0.06
     )
 
-    for i, m in enumerate(metrics, start=1):
-        df_m = df[df["metric"] == m]
+    for i, (m, df_m) in enumerate(metric_frames, start=1):
+        m = str(m)
         fig.add_trace(
-            go.Scatter(
+            go.Scattergl(  # WebGL: GPU-rendered, stays fast with long series
                 x=df_m["date"],
-                y=df_m["value"],
+                y=plot_values(df_m["value"]),
                 mode="lines+markers",
                 name=m,
                 showlegend=False,
-                marker=dict(size=6),
                 hovertemplate="<b>%{fullData.name}</b><br>Date: %{x|%Y-%m-%d}<br>Value: %{y:.2f}<extra></extra>"
             ),
             row=i, col=1
@@ -501,44 +650,6 @@ app.layout = html.Div([
     dcc.Graph(id="metrics_graph")
 ])
 
-# ------------------------- #
-# Function to create figure #
-# ------------------------- #
-
-def create_group_figure(df, county_name, group_name):
-    metrics = sorted(df["metric"].unique())
-    n_rows = len(metrics)
-
-    fig = make_subplots(
-        rows=n_rows, cols=1,
-        shared_xaxes=True,
-        subplot_titles=metrics,
-        vertical_spacing=0.06
-    )
-
-    for i, m in enumerate(metrics, start=1):
-        df_m = df[df["metric"] == m]
-        fig.add_trace(
-            go.Scatter(
-                x=df_m["date"],
-                y=df_m["value"],
-                mode="lines+markers",
-                name=m,
-                showlegend=False,
-                marker=dict(size=6),
-                hovertemplate="<b>%{fullData.name}</b><br>Date: %{x|%Y-%m-%d}<br>Value: %{y:.2f}<extra></extra>"
-            ),
-            row=i, col=1
-        )
-        fig.update_yaxes(title_text="Value", row=i, col=1)
-
-    fig.update_xaxes(title_text="Date", row=n_rows, col=1)
-    fig.update_layout(
-        height=250*n_rows,
-        title_text=f"{county_name} – {group_name.title()} Metrics Over Time"
-    )
-    return fig
-
 # --------------------------------------- #
 # Single callback with "No Data" Handling #
 # --------------------------------------- #
@@ -582,235 +693,4 @@ def update_metrics_graph(county_name_pretty, group_name):
 if __name__ == "__main__":
     app.run(debug=True)
 
-
-##############################################################
-
-
-TODO Not sure if this is necessary
-
-# ---------------------------------------------------------- #
-# Dash callback already works with friendly labels
-# ---------------------------------------------------------- #
-
-@callback(
-    Output("metrics_graph", "figure"),
-    Input("county_dropdown", "value"),
-    Input("group_dropdown", "value")
-)
-def update_metrics_graph(county_name_pretty, group_name):
-    df = get_group_data_for_county(county_name_pretty, group_name)
-    fig = create_group_figure(df, county_name_pretty)
-    return fig
-
-
-
-##############################################################
-
-# ---------------------------------------- #
-# Create Dash App
-# ---------------------------------------- #
-app = Dash(__name__)
-
-# Dynamic dropdown options
-county_options = sorted(county_list)  # Pretty names from Excel
-group_options = sorted(county_metrics_df["group"].unique())  # All groups dynamically
-
-app.layout = html.Div([
-    html.H2("Maryland County Metrics"),
-    html.Div([
-        html.Label("Select County:"),
-        dcc.Dropdown(
-            id="county_dropdown",
-            options=[{"label": c, "value": c} for c in county_options],
-            value=county_options[0],
-            clearable=False,
-            style={"width": "300px"}
-        ),
-    ]),
-    html.Div([
-        html.Label("Select Metric Group:"),
-        dcc.Dropdown(
-            id="group_dropdown",
-            options=[{"label": g.title(), "value": g} for g in group_options],
-            value=group_options[0],
-            clearable=False,
-            style={"width": "300px"}
-        ),
-    ]),
-    dcc.Graph(id="metrics_graph")
-])
-
-# ---------------------------------------- #
-# Function to create Plotly figure
-# ---------------------------------------- #
-def create_group_figure(df, county_name, group_name):
-    metrics = sorted(df["metric"].unique())
-    n_rows = len(metrics)
-
-    fig = make_subplots(
-        rows=n_rows, cols=1, shared_xaxes=True,
-        subplot_titles=metrics, vertical_spacing=0.06
-    )
-
-    for i, m in enumerate(metrics, start=1):
-        df_m = df[df["metric"] == m]
-        fig.add_trace(
-            go.Scatter(
-                x=df_m["date"],
-                y=df_m["value"],
-                mode="lines+markers",
-                name=m,
-                showlegend=False,
-                marker=dict(size=6),
-                hovertemplate="<b>%{fullData.name}</b><br>Date: %{x|%Y-%m-%d}<br>Value: %{y:.2f}<extra></extra>"
-            ),
-            row=i, col=1
-        )
-        fig.update_yaxes(title_text="Value", row=i, col=1)
-
-    fig.update_xaxes(title_text="Date", row=n_rows, col=1)
-    fig.update_layout(
-        height=250*n_rows,
-        title_text=f"{county_name} – {group_name.title()} Metrics Over Time"
-    )
-    return fig
-
-# ---------------------------------------- #
-# Callback to update figure based on dropdown
-# ---------------------------------------- #
-@app.callback(
-    Output("metrics_graph", "figure"),
-    Input("county_dropdown", "value"),
-    Input("group_dropdown", "value")
-)
-def update_metrics_graph(county_name_pretty, group_name):
-    # Dynamically fetch metrics for selected county and group
-    df = get_group_data_for_county(county_name_pretty, group_name)
-    return create_group_figure(df, county_name_pretty, group_name)
-
-# ---------------------------------------- #
-# Run app
-# ---------------------------------------- #
-if __name__ == "__main__":
-    app.run_server(debug=True)
-
-
-######################################################
-# ------------ GRAPHING SPECIFIC GRAPHS ------------ #
-# ----- HOUSING Metrics for Maryland Counties ------ #
-######################################################
-
-
-HOUSING_METRICS = {
-    "all_transaction_house_price_index": "All-Transaction House Price Index",
-    "new_private_housing_units_authorized_by_building_permits_count": "New Private Housing Units (Permits)",
-    "housing_inventory_active_listing_count": "Active Listings",
-    "housing_inventory_median_listing_price_dollars": "Median Listing Price ($)",
-}
-
-def get_housing_data_for_county(county_name_pretty: str) -> pd.DataFrame:
-    
-    county_snake = to_snake_case(county_name_pretty)
-    county_folder = county_base_dir / county_snake
-
-    if not county_folder.exists():
-        raise FileNotFoundError(f"No folder found for county: {county_folder}")
-
-    frames = []
-
-    for stem, label in HOUSING_METRICS.items():
-        csv_path = county_folder / f"{county_snake}_{stem}.csv"
-        if not csv_path.exists():
-            
-            continue
-
-        df = pd.read_csv(csv_path)
-
-       
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"])
-
-        df["metric"] = label
-        frames.append(df)
-
-    if not frames:
-        raise ValueError(f"No housing metrics found for county: {county_name_pretty}")
-
-    return pd.concat(frames, ignore_index=True)
-
-
-
-def plot_housing_for_county_separate(county_name_pretty: str):
-    
-    df = get_housing_data_for_county(county_name_pretty)
-
-   
-    metrics = sorted(df["metric"].unique())
-    n_rows = len(metrics)
-
-    fig = make_subplots(
-        rows=n_rows,
-        cols=1,
-        shared_xaxes=True,
-        subplot_titles=metrics,   
-        vertical_spacing=0.06,
-    )
-
-    for i, m in enumerate(metrics, start=1):
-        df_m = df[df["metric"] == m]
-
-        fig.add_trace(
-            go.Scatter(
-                x=df_m["date"],
-                y=df_m["value"],
-                mode="lines+markers",
-                name=m,
-                showlegend=False,
-                marker=dict(size=6),
-                hovertemplate=(
-                    "<b>%{fullData.name}</b><br>"
-                    "Date: %{x|%Y-%m-%d}<br>"
-                    "Value: %{y:.2f}<extra></extra>"
-                ),
-            ),
-            row=i,
-            col=1,
-        )
-
-        fig.update_yaxes(title_text="Value", row=i, col=1)
-
-    fig.update_xaxes(title_text="Date", row=n_rows, col=1)
-
-    fig.update_layout(
-        height=250 * n_rows,
-        title_text=f"Housing Indicators Over Time – {county_name_pretty}",
-    )
-
-    fig.show()
-
-county_options = [
-    "Allegany", "Anne Arundel", "Baltimore", "Baltimore City",
-    "Calvert", "Caroline", "Carroll", "Cecil", "Charles",
-    "Dorchester", "Frederick", "Garrett", "Harford", "Howard",
-    "Kent", "Montgomery", "Prince George's", "Queen Anne's",
-    "Somerset", "St. Mary's", "Talbot", "Washington",
-    "Wicomico", "Worcester",
-]
-
-@interact(county=Dropdown(options=county_options, description="County:"))
-def show_housing(county):
-    plot_housing_for_county_separate(county)
-
-######################################################
-# ------------ GRAPHING SPECIFIC GRAPHS ------------ #
-# ----- ECONOMIC Metrics for Maryland Counties ----- #
-######################################################
-
-
-
-######################################################
-# ------------ GRAPHING SPECIFIC GRAPHS ------------ #
-# ------ LABOR Metrics for Maryland Counties ------- #
-######################################################
-
-"""
\ No newline at end of file
+"""
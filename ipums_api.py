@@ -3,13 +3,31 @@
 
 import os
 import time
+import csv
 import json
+import random
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import yaml
 import pandas as pd
 import zipfile
 import shutil
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Optional: pyarrow's C++ streaming CSV reader for the large NHGIS file
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pacsv
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+    print("[INFO] pyarrow not installed; using pandas' chunked C engine for the CSV read.")
+
+# Copy-on-write: the per-table column slices below stay views (nothing here writes to them)
+pd.set_option("mode.copy_on_write", True)
 
 # ------------------------- #
 # 0. Setup & Configuration  #
@@ -25,16 +43,23 @@ os.makedirs(raw_download_folder, exist_ok=True)
 
 # --- CLEANUP: Wipe OLD files (Outputs AND Raw Zips) ---
 print(f"[INFO] Cleaning up old files...")
+def remove_entry(entry):
+    """Delete one scandir entry (file, symlink, or directory tree), reporting failures."""
+    try:
+        if entry.is_file() or entry.is_symlink():
+            os.unlink(entry.path)
+        elif entry.is_dir():
+            shutil.rmtree(entry.path)
+    except Exception as e:
+        print(f"Failed to delete {entry.path}. Reason: {e}")
+
+# scandir entries carry their own type info (no extra stat() per file);
+# the deletes themselves are syscall-bound, so they run in parallel
 for folder in [md_demog_output_folder, raw_download_folder]:
-    for filename in os.listdir(folder):
-        file_path = os.path.join(folder, filename)
-        try:
-            if os.path.isfile(file_path) or os.path.islink(file_path):
-                os.unlink(file_path)
-            elif os.path.isdir(file_path):
-                shutil.rmtree(file_path)
-        except Exception as e:
-            print(f"Failed to delete {file_path}. Reason: {e}")
+    with os.scandir(folder) as it:
+        entries = list(it)
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        list(ex.map(remove_entry, entries))
 print(f"[INFO] Folders wiped clean.")
 
 # Load API Keys
@@ -47,6 +72,18 @@ headers = {
     "Content-Type": "application/json"
 }
 
+# One pooled session for submit, status polling, and download (TLS handshake paid once)
+# GETs are retried on rate limits/server errors; the extract POST is not, to avoid duplicate extracts
+session = requests.Session()
+session.headers.update(headers)
+retry = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET"],
+)
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+
 # ------------------------- #
 # 1. Load Excel Series IDs  #
 # ------------------------- #
@@ -62,27 +99,23 @@ id_list = series_id_df.iloc[0].dropna().astype(str).tolist()[1:]
 # ------------------------- #
 # 2. Parse IDs              #
 # ------------------------- #
-def split_id(x):
-    name = x[:3]       # e.g., A00
-    specifier = x[3:5] # e.g., AA
-    year = x[-4:]      # e.g., 1920
-    return pd.Series([name, specifier, year])
-
+# Fixed-position fields, so plain vectorized string slices do the split
 parsed_df = pd.DataFrame(id_list, columns=["full_id"])
-parsed_df[["name", "specifier", "year"]] = parsed_df["full_id"].apply(split_id)
-parsed_df["year"] = parsed_df["year"].astype(int)
+full_ids = parsed_df["full_id"].str
+parsed_df["name"] = full_ids.slice(0, 3)              # e.g., A00
+parsed_df["specifier"] = full_ids.slice(3, 5)         # e.g., AA
+parsed_df["year"] = full_ids.slice(-4).astype("int16")  # e.g., 1920 (int16 is plenty for years)
 
 # ------------------------- #
 # 3. Build & Submit Extract #
 # ------------------------- #
-time_series_tables = defaultdict(lambda: {"years": set(), "geogLevels": ["state"]})
-# NOTE: If you need county-level data, change ["state"] to ["county"] below
-for _, row in parsed_df.iterrows():
-    time_series_tables[row["name"]]["years"].add(str(row["year"]))
+# Unique years per table in one groupby pass (sorted as strings, as the API expects)
+years_by_table = parsed_df.groupby("name", sort=False)["year"].unique()
 
+# NOTE: If you need county-level data, change ["state"] to ["county"] below
 time_series_tables = {
-    table: {"years": sorted(list(values["years"])), "geogLevels": values["geogLevels"]}
-    for table, values in time_series_tables.items()
+    table: {"years": sorted(map(str, years)), "geogLevels": ["state"]}
+    for table, years in years_by_table.items()
 }
 
 extract_payload = {
@@ -94,7 +127,7 @@ extract_payload = {
 }
 
 url = "https://api.ipums.org/extracts/?collection=nhgis&version=2"
-response = requests.post(url, headers=headers, json=extract_payload)
+response = session.post(url, json=extract_payload)
 response_json = response.json()
 
 if "number" not in response_json:
@@ -110,8 +143,11 @@ print(f"[INFO] Extract #{extract_number} submitted. Waiting for processing...")
 # ------------------------- #
 status_url = f"https://api.ipums.org/extracts/{extract_number}?collection=nhgis&version=2"
 
+# Poll with exponential backoff (2s -> 60s) plus jitter: quick extracts are picked up fast,
+# long ones are not polled needlessly often
+poll_delay = 2
 while True:
-    resp = requests.get(status_url, headers=headers)
+    resp = session.get(status_url)
     extract_info = resp.json()
     status = extract_info.get("status")
     
@@ -122,15 +158,20 @@ while True:
         print("[ERROR] Extract generation failed.")
         exit()
     else:
-        print(f"Status: {status}. Retrying in 30s...")
-        time.sleep(30)
+        wait = poll_delay + random.uniform(0, poll_delay * 0.1)
+        print(f"Status: {status}. Retrying in {wait:.0f}s...")
+        time.sleep(wait)
+        poll_delay = min(poll_delay * 2, 60)
 
 if "downloadLinks" in extract_info:
     download_url = extract_info["downloadLinks"]["tableData"]["url"]
-    r = requests.get(download_url, headers=headers)
     zip_path = os.path.join(raw_download_folder, f"nhgis{extract_number:04d}.zip")
-    with open(zip_path, "wb") as f:
-        f.write(r.content)
+    # Stream to disk in 1 MB chunks instead of holding the whole ZIP in memory
+    with session.get(download_url, stream=True) as r:
+        r.raise_for_status()
+        with open(zip_path, "wb") as f:
+            for chunk in r.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
 else:
     print("[ERROR] Download link not found.")
     exit()
@@ -138,10 +179,18 @@ else:
 # Extract CSV
 target_csv_name = ""
 with zipfile.ZipFile(zip_path, 'r') as z:
-    for filename in z.namelist():
+    for info in z.infolist():
+        filename = info.filename
         if filename.endswith(".csv") and "codebook" not in filename:
-            z.extract(filename, raw_download_folder)
             target_csv_name = os.path.join(raw_download_folder, filename)
+            # Unlike z.extract, a raw copy doesn't sanitize paths -- refuse members that escape the folder
+            if os.path.commonpath([os.path.realpath(target_csv_name), os.path.realpath(raw_download_folder)]) != os.path.realpath(raw_download_folder):
+                print(f"[WARN] Skipping unsafe ZIP member path: {filename}")
+                continue
+            os.makedirs(os.path.dirname(target_csv_name), exist_ok=True)
+            # Stream the member straight to its target path
+            with z.open(info) as src, open(target_csv_name, "wb") as dst:
+                shutil.copyfileobj(src, dst, length=1 << 20)
             print(f"[INFO] Extracted raw CSV: {target_csv_name}")
 
 # ------------------------- #
@@ -168,19 +217,44 @@ filename_map = {
     "AG4": "Families_By_Family_Type_By_Presence_And_Age_Of_Own_Children",
 }
 
-# Step A: Read Headers
-df_raw = pd.read_csv(target_csv_name, header=None, low_memory=False)
-header_codes = df_raw.iloc[0] 
-header_names = df_raw.iloc[1] 
-data_rows = df_raw.iloc[2:]   
+def read_state_rows(path, state_pos, n_cols, state_name="Maryland"):
+    """
+    Stream the data rows (everything after the two header rows) and keep only the rows
+    whose column `state_pos` equals `state_name`, so the full national file is never in memory.
+    Every column is read as text; columns come back numbered 0..n_cols-1.
+    Uses pyarrow's streaming CSV reader when available, pandas' chunked C engine otherwise.
+    """
+    if HAVE_PYARROW:
+        names = [f"c{i}" for i in range(n_cols)]
+        reader = pacsv.open_csv(
+            path,
+            read_options=pacsv.ReadOptions(skip_rows=2, column_names=names, block_size=16 << 20),
+            # Empty / NA cells come back as nulls (-> NaN), as with pandas' reader
+            convert_options=pacsv.ConvertOptions(
+                column_types={n: pa.string() for n in names},
+                strings_can_be_null=True,
+            ),
+        )
+        batches = [batch.filter(pc.equal(batch.column(state_pos), state_name)) for batch in reader]
+        df = pa.Table.from_batches(batches, schema=reader.schema).to_pandas()
+        df.columns = range(n_cols)
+        return df
 
-data_rows.columns = header_codes
+    chunks = pd.read_csv(path, header=None, skiprows=2, dtype=str, chunksize=200_000, low_memory=False)
+    frames = [chunk[chunk[state_pos] == state_name] for chunk in chunks]
+    if not frames:
+        return pd.DataFrame(columns=range(n_cols))
+    return pd.concat(frames, ignore_index=True)
 
-# Step B: Filter for Maryland
-if "STATE" in data_rows.columns:
-    md_data = data_rows[data_rows["STATE"] == "Maryland"].copy()
-else:
-    md_data = data_rows[data_rows.iloc[:, 2] == "Maryland"].copy() 
+# Step A: Read Headers (just the two header rows)
+header_rows = pd.read_csv(target_csv_name, header=None, dtype=str, nrows=2)
+header_codes = header_rows.iloc[0] 
+header_names = header_rows.iloc[1] 
+
+# Step B: Filter for Maryland while reading (STATE column, else the 3rd column as before)
+state_pos = header_codes.tolist().index("STATE") if "STATE" in header_codes.values else 2
+md_data = read_state_rows(target_csv_name, state_pos, len(header_codes))
+md_data.columns = header_codes
 
 print(f"[INFO] Filtered rows for Maryland: {len(md_data)}")
 
@@ -189,33 +263,49 @@ base_cols = ["GISJOIN", "YEAR", "STATE", "STATEFP", "STATENH", "NAME"]
 valid_base_cols = [c for c in base_cols if c in md_data.columns]
 
 # Step D: Group & Save
-metric_cols = [c for c in md_data.columns if c not in valid_base_cols]
+# Columns are tracked by position: NHGIS codes can repeat, and label selection
+# would pull every duplicate once per occurrence
+codes = md_data.columns.tolist()
+base_pos = [codes.index(c) for c in valid_base_cols]
 
 grouped_metrics = defaultdict(list)
-for col in metric_cols:
+for pos, col in enumerate(codes):
+    if col in valid_base_cols:
+        continue
     prefix = col[:3]
-    grouped_metrics[prefix].append(col)
+    grouped_metrics[prefix].append(pos)
 
-for prefix, cols in grouped_metrics.items():
+# Both header rows as one frame, built once and sliced per table
+header_df = pd.concat([header_codes.to_frame().T, header_names.to_frame().T], ignore_index=True)
+header_df.columns = header_codes
+# Empty header cells arrive as NaN; csv.writer would print them as "nan" (to_csv wrote nothing)
+header_df = header_df.fillna("")
+
+def write_table(prefix, positions):
+    """Write one NHGIS table (base columns + its metric columns, with both header rows)."""
     human_name = filename_map.get(prefix, f"Table_{prefix}")
     
     # Slice Data
-    selection_cols = valid_base_cols + cols
-    subset_data = md_data[selection_cols]
-    
-    # Headers
-    header_df = pd.concat([header_codes.to_frame().T, header_names.to_frame().T])
-    header_df.columns = header_codes 
-    subset_headers = header_df[selection_cols]
+    selection_pos = base_pos + positions
+    subset_data = md_data.iloc[:, selection_pos]
     
-    final_output = pd.concat([subset_headers, subset_data], ignore_index=True)
+    # Headers (slice of the shared two-row header frame)
+    subset_headers = header_df.iloc[:, selection_pos]
     
     # SAVE: Added {prefix} to filename to prevent duplicates
     out_filename = f"Maryland_{human_name}_{prefix}.csv"
     out_path = os.path.join(md_demog_output_folder, out_filename)
-    final_output.to_csv(out_path, index=False, header=False) 
+    # Two header rows via csv.writer, then the data appended (no headers+data concat copy)
+    with open(out_path, "w", newline="", encoding="utf-8") as fh:
+        csv.writer(fh).writerows(subset_headers.values.tolist())
+        subset_data.to_csv(fh, header=False, index=False)
     
-    print(f"   -> Saved {out_filename}")
+    return out_filename
+
+# Tables are independent, so write them concurrently (file I/O overlaps across threads)
+with ThreadPoolExecutor(max_workers=min(8, len(grouped_metrics) or 1)) as ex:
+    for out_filename in ex.map(lambda item: write_table(*item), grouped_metrics.items()):
+        print(f"   -> Saved {out_filename}")
 
 print("-" * 50)
 print(f"[SUCCESS] Process complete. Files saved in: {md_demog_output_folder}")
\ No newline at end of file
@@ -2,6 +2,18 @@ import pandas as pd
 import requests
 import os
 import io
+import json
+import importlib.util
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+
+# Faster JSON decoding of the API response when orjson is installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    print("[INFO] orjson not installed; using the standard json module.")
+    json_loads = json.loads
 
 # --------------------------------------------------------- #
 # CONFIGURATION
@@ -10,24 +22,62 @@ DATASET_ID = "w3bc-8mnv"
 BASE_URL = f"https://opendata.maryland.gov/resource/{DATASET_ID}.json"
 OUTPUT_DIR = "maryland_foreclosure_data"
 
+# Pages are fetched in parallel (one worker per pooled connection)
+PAGE_SIZE = 5000
+PAGE_WORKERS = 4
+
+# One keep-alive session for every request to the portal (TLS handshake paid once; gzip is on by default)
+SESSION = requests.Session()
+SESSION.headers.update({"Accept-Encoding": "gzip"})
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
 # Ensure output directory exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Parquet copies (typed, smaller, faster to re-read) are written when pyarrow is installed
+have_parquet = importlib.util.find_spec("pyarrow") is not None
+if not have_parquet:
+    print("[INFO] pyarrow not installed; writing CSV outputs only.")
+
 print(f"[INFO] Fetching data from Maryland Open Data ({DATASET_ID})...")
 
 # --------------------------------------------------------- #
 # 1. FETCH DATA
 # --------------------------------------------------------- #
-# Socrata limits to 1000 rows by default, so we set a high limit to get everything
-params = {"$limit": "50000"} 
-response = requests.get(BASE_URL, params=params)
+# Socrata limits to 1000 rows by default, so page through with $limit/$offset.
+# Ask for the row count first, then fetch all pages concurrently.
+count_resp = SESSION.get(BASE_URL, params={"$select": "count(*)"}, timeout=60)
 
-if response.status_code != 200:
-    print(f"[ERROR] Failed to fetch data: {response.status_code}")
+if count_resp.status_code != 200:
+    print(f"[ERROR] Failed to fetch data: {count_resp.status_code}")
+    exit()
+
+count_row = json_loads(count_resp.content)[0]
+total_rows = int(next(iter(count_row.values())))
+offsets = list(range(0, total_rows, PAGE_SIZE))
+print(f"[INFO] {total_rows} rows in {len(offsets)} pages of up to {PAGE_SIZE}...")
+
+def fetch_page(offset):
+    """Fetch one page of rows; a stable $order on the row id keeps pages from overlapping."""
+    params = {"$limit": str(PAGE_SIZE), "$offset": str(offset), "$order": ":id"}
+    resp = SESSION.get(BASE_URL, params=params, timeout=60)
+    if resp.status_code != 200:
+        return resp.status_code, None
+    # Parse the raw bytes straight into a frame; keep every value as the API's text
+    # (dates included) so the cleanup below sees the same strings as before
+    return 200, pd.read_json(io.BytesIO(resp.content), orient="records", dtype=False, convert_dates=False)
+
+with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as ex:
+    pages = list(ex.map(fetch_page, offsets))
+
+failed = [status for status, _ in pages if status != 200]
+if failed:
+    print(f"[ERROR] Failed to fetch data: {failed[0]}")
     exit()
 
 # Load into DataFrame
-df = pd.DataFrame(response.json())
+frames = [page for _, page in pages]
+df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
 print(f"[INFO] Raw data loaded. {len(df)} rows found.")
 print(f"[INFO] Columns found: {list(df.columns)}")
@@ -48,52 +98,43 @@ county_cols = [c for c in df.columns if c not in [date_col, type_col] and not c.
 
 print(f"[INFO] Processing {len(county_cols)} counties...")
 
-# Step A: "Melt" the dataframe (Unpivot)
-# Turn columns (Allegany, Anne Arundel) into rows
-# Result: date | type | county_name | value
-df_melted = df.melt(id_vars=[date_col, type_col], 
-                    value_vars=county_cols, 
-                    var_name='county_name', 
-                    value_name='value')
+# Clean up the Date format once, before reshaping (remove T00:00:00.000)
+# Socrata dates look like '2021-07-01T00:00:00.000'. We want '2021-07-01'.
+df[date_col] = df[date_col].str.slice(0, 10)
 
-# Convert value to numeric (handle errors if any non-numbers exist)
-df_melted['value'] = pd.to_numeric(df_melted['value'], errors='coerce').fillna(0)
+# Step A: Index by (Date, Type) instead of melting
+# Each county column is then already that county's Date x Type series -- no long
+# rows*counties intermediate and no pivot back
+df_indexed = df.set_index([date_col, type_col])[county_cols]
 
-# Step B: "Pivot" the dataframe
-# We want: Index=Date, Columns=Type (NOI, NOF, FPR), Values=Count
-# But we need to do this *per county*.
-grouped = df_melted.groupby('county_name')
+# Convert values to numeric column by column, before any reshape (handle errors if any non-numbers exist)
+# float32 is exact for these counts and halves the frame
+df_indexed = df_indexed.apply(pd.to_numeric, errors='coerce').fillna(0).astype('float32')
 
 # --------------------------------------------------------- #
 # 3. EXPORT PER COUNTY
 # --------------------------------------------------------- #
-for county_clean_name, county_data in grouped:
-    
-    # Pivot: Dates as rows, Types as columns
-    df_county_pivoted = county_data.pivot(index=date_col, columns=type_col, values='value')
+for county_clean_name in county_cols:
     
-    # Reset index to make Date a column again
-    df_county_pivoted = df_county_pivoted.reset_index()
-    
-    # Rename 'date' to 'OBSERVATION DATE' to match client sheets
-    df_county_pivoted = df_county_pivoted.rename(columns={date_col: 'OBSERVATION DATE'})
-    
-    # Sort by date
-    df_county_pivoted = df_county_pivoted.sort_values('OBSERVATION DATE')
-    
-    # Clean up the Date format (remove T00:00:00.000)
-    # Socrata dates look like '2021-07-01T00:00:00.000'. We want '2021-07-01'.
-    df_county_pivoted['OBSERVATION DATE'] = df_county_pivoted['OBSERVATION DATE'].str.split('T').str[0]
+    # Step B: Unstack Types into columns -> Dates as rows, Types (NOI, NOF, FPR) as columns
+    df_county_pivoted = df_indexed[county_clean_name].unstack(type_col).sort_index()
     
     # Clean up column names (remove index name)
     df_county_pivoted.columns.name = None
     
+    # Rename 'date' to 'OBSERVATION DATE' to match client sheets
+    df_county_pivoted = df_county_pivoted.rename_axis('OBSERVATION DATE').reset_index()
+    
     # Generate filename (Clean up county name format, e.g., 'allegany_county' -> 'ALLEGANY')
     filename_county = county_clean_name.replace("_county", "").upper()
     save_path = os.path.join(OUTPUT_DIR, f"{filename_county}.csv")
     
-    # Save
-    df_county_pivoted.to_csv(save_path, index=False)
+    # Save (CSV matches the client sheets; Parquet alongside for programmatic readers)
+    # One buffered handle per file: pandas formats into a 1 MB buffer that is written out once on close
+    with open(save_path, "w", newline="", encoding="utf-8", buffering=1 << 20) as fh:
+        df_county_pivoted.to_csv(fh, index=False)
+    if have_parquet:
+        df_county_pivoted.to_parquet(save_path.replace(".csv", ".parquet"), compression="snappy", index=False)
     print(f"  [SAVED] {save_path}")
 
 print("\n[INFO] Process Complete. Check the output folder!")
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""Regression tests for build_county_df in Backup_Route/maryland_fred_github_automation.py."""
+
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("fredapi")
+pytest.importorskip("tqdm")
+
+SCRIPT = Path(__file__).resolve().parents[1] / "Backup_Route" / "maryland_fred_github_automation.py"
+
+
+@pytest.fixture(scope="module")
+def pipeline(tmp_path_factory):
+    """Import the pipeline script in a scratch directory (it creates data/ and .cache/ on import)."""
+    workdir = tmp_path_factory.mktemp("pipeline")
+    cwd = os.getcwd()
+    saved_key = os.environ.get("FRED_API_KEY")
+    saved_hyper = sys.modules.get("tableauhyperapi")
+    os.environ["FRED_API_KEY"] = saved_key or "test-key"
+    sys.modules["tableauhyperapi"] = None  # skip the import-time .hyper export
+    os.chdir(workdir)
+    try:
+        spec = importlib.util.spec_from_file_location("maryland_fred_github_automation", SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module
+    finally:
+        os.chdir(cwd)
+        if saved_key is None:
+            os.environ.pop("FRED_API_KEY", None)
+        if saved_hyper is None:
+            sys.modules.pop("tableauhyperapi", None)
+        else:
+            sys.modules["tableauhyperapi"] = saved_hyper
+
+
+def build(pipeline, series):
+    """Run fetch-free normalize_fetched + build_county_df for {metric: (series_id, freq, pd.Series)}."""
+    meta = {"County": "Test", "series": {m: (sid, freq) for m, (sid, freq, _) in series.items()}}
+    fetched = {sid: (data, None) for sid, _, data in series.values()}
+    plan = pd.DataFrame(
+        [(sid, freq) for sid, freq, _ in series.values()], columns=["Series_ID", "Frequency"]
+    )
+    normalized = pipeline.normalize_fetched(fetched, plan)
+    return pipeline.build_county_df("TS", meta, fetched, normalized).set_index("Date")
+
+
+def test_annual_nan_year_stays_nan(pipeline):
+    annual = pd.Series(
+        [10.0, float("nan"), 30.0],
+        index=pd.to_datetime(["2019-01-01", "2020-01-01", "2021-01-01"]),
+    )
+    df = build(pipeline, {"Poverty": ("ANNUAL", "A", annual)})
+
+    expected = (
+        pipeline.period_to_month_end(pd.DataFrame({"Date": annual.index, "Value": annual.values, "Freq": "A"}))
+        .set_index("Date")["Value"]
+        .resample("ME")
+        .ffill()
+    )
+    # Every month resample().ffill() produced is present, with the same value (NaN year included)
+    pd.testing.assert_series_equal(
+        df["Poverty"], expected, check_names=False, check_freq=False, check_index_type=False
+    )
+
+
+def test_all_nan_observation_rows_are_kept(pipeline):
+    monthly = pd.Series(
+        [1.0, float("nan"), 3.0],
+        index=pd.to_datetime(["2020-01-01", "2020-02-01", "2020-03-01"]),
+    )
+    annual = pd.Series([float("nan")], index=pd.to_datetime(["2020-01-01"]))
+    df = build(pipeline, {"Rate": ("MONTHLY", "M", monthly), "Poverty": ("ANNUAL", "A", annual)})
+
+    # February is a real (all-NaN) observation row and must not be dropped
+    assert list(df.index) == list(pd.to_datetime(["2020-01-31", "2020-02-29", "2020-03-31"]))
+    assert df.loc["2020-02-29", ["Rate", "Poverty"]].isna().all()
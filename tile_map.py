@@ -1,8 +1,21 @@
 import os
+import io
+import json
 import glob
+import importlib.util
 import requests
+import numpy as np
+from requests.adapters import HTTPAdapter
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
+
+# Faster GeoJSON parsing when orjson is installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    print("[INFO] orjson not installed; using the standard json module.")
+    json_loads = json.loads
 
 # ---- 1. Paths ----
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -12,24 +25,120 @@ os.makedirs(output_dir, exist_ok=True)
 
 # ---- 2. Load GEOJSON ----
 url = "https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json"
-counties = requests.get(url).json()
+
+# Shared keep-alive session for the GeoJSON (and any other) downloads
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+cache_dir = os.path.join(script_dir, ".cache")
+geojson_cache = os.path.join(cache_dir, "counties.geojson")
+
+def load_counties():
+    """
+    Load the county GeoJSON from a local cache, revalidated with an ETag (If-None-Match):
+    a 304 reuses the cached file, a 200 refreshes it. Works offline once cached.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    etag_path = geojson_cache + ".etag"
+
+    headers = {}
+    if os.path.exists(geojson_cache) and os.path.exists(etag_path):
+        with open(etag_path) as fh:
+            headers["If-None-Match"] = fh.read().strip()
+
+    try:
+        resp = SESSION.get(url, headers=headers, timeout=30)
+        if resp.status_code == 200:
+            tmp_path = geojson_cache + ".tmp"
+            with open(tmp_path, "wb") as fh:
+                fh.write(resp.content)
+            os.replace(tmp_path, geojson_cache)
+            if resp.headers.get("ETag"):
+                with open(etag_path, "w") as fh:
+                    fh.write(resp.headers["ETag"])
+            elif os.path.exists(etag_path):
+                os.remove(etag_path)
+        elif resp.status_code != 304:
+            resp.raise_for_status()
+    except requests.RequestException as e:
+        if not os.path.exists(geojson_cache):
+            raise
+        print(f"[WARN] GeoJSON refresh failed ({e}); using cached copy.")
+
+    with open(geojson_cache, "rb") as fh:
+        return json_loads(fh.read())
+
+def round_coords(coords, ndigits):
+    """Round a (nested) GeoJSON coordinate array to `ndigits` decimals."""
+    if coords and isinstance(coords[0], (int, float)):
+        return [round(c, ndigits) for c in coords]
+    return [round_coords(c, ndigits) for c in coords]
+
+def shrink_geojson(geo, state_fips="24", ndigits=5):
+    """
+    Keep only one state's counties (~3,200 -> 24 features for Maryland) and round coordinates
+    (5 decimals is ~1 m, invisible at this zoom), so each HTML map embeds far less geometry.
+    """
+    features = []
+    for feature in geo["features"]:
+        if not str(feature.get("id", "")).startswith(state_fips):
+            continue
+        geometry = dict(feature["geometry"], coordinates=round_coords(feature["geometry"]["coordinates"], ndigits))
+        features.append(dict(feature, geometry=geometry))
+    return dict(geo, features=features)
+
+counties = shrink_geojson(load_counties())
 
 # ---- 3. Read CSVs ----
-files = glob.glob(os.path.join(merged_dir, "*_all_metrics.csv"))
-all_rows = []
+def read_last_csv_row(path, block_size=4096):
+    """
+    Parse only the header and the final data row of a CSV (the maps only need the latest row).
+    Reads backwards from the end of the file in blocks until a complete last line is found.
+    """
+    with open(path, "rb") as fh:
+        header = fh.readline()
+        data_start = fh.tell()
+        fh.seek(0, os.SEEK_END)
+        end = fh.tell()
 
-for f in files:
-    county = os.path.basename(f).replace("_all_metrics.csv", "")
-    df = pd.read_csv(f)
+        pos, tail = end, b""
+        while pos > data_start:
+            step = min(block_size, pos - data_start)
+            pos -= step
+            fh.seek(pos)
+            tail = fh.read(step) + tail
+            lines = tail.rstrip(b"\r\n").splitlines()
+            # A full last line is known once a newline precedes it (or we reached the data start)
+            if len(lines) > 1 or pos == data_start:
+                break
 
-    date_col = [c for c in df.columns if "date" in c.lower()][0]
-    latest = df.iloc[-1].copy()
-    latest["County"] = county
-    latest["Date"] = df[date_col].iloc[-1]
+    lines = tail.rstrip(b"\r\n").splitlines()
+    last = lines[-1] if lines else b""
+    return pd.read_csv(io.BytesIO(header + last + b"\n"))
 
-    all_rows.append(latest)
+# The merged CSVs are the source of truth. Each file's Parquet copy from bls_api.py (typed, no
+# re-parsing) is used only while it is at least as new as its CSV; a missing or stale copy
+# (e.g. a later run without pyarrow, or a partial run) falls back to that file's CSV
+have_parquet = importlib.util.find_spec("pyarrow") is not None
 
-md = pd.DataFrame(all_rows)
+def read_last_row(csv_path):
+    """Last row of one merged county file, from its Parquet copy when that is up to date."""
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+    if have_parquet:
+        try:
+            if os.stat(parquet_path).st_mtime_ns >= os.stat(csv_path).st_mtime_ns:
+                return pd.read_parquet(parquet_path).tail(1)
+        except FileNotFoundError:
+            pass  # no Parquet copy for this county
+    return read_last_csv_row(csv_path)
+
+# Latest row per county in one concat (each file's last row, tagged with its county)
+files = glob.glob(os.path.join(merged_dir, "*_all_metrics.csv"))
+md = pd.concat(
+    [read_last_row(f).assign(County=os.path.basename(f).replace("_all_metrics.csv", "")) for f in files],
+    ignore_index=True,
+)
+date_col = [c for c in md.columns if "date" in c.lower()][0]
+md["Date"] = md[date_col]
 
 # ---- 4. FIPS Mapping ----
 county_to_fips = {
@@ -59,7 +168,14 @@ county_to_fips = {
     "worcester": "24047"
 }
 
-md["fips"] = md["County"].map(county_to_fips).astype(str).str.zfill(5)
+# Categorical County: the lookups below relabel 24 categories instead of mapping every row
+md["County"] = pd.Categorical(md["County"], categories=list(county_to_fips))
+md["fips"] = md["County"].cat.rename_categories(county_to_fips).astype(str)
+
+# Feature index by FIPS id, built once: the shared GeoJSON then holds exactly the plotted
+# counties, in the same order as the `locations` of every trace
+feature_index = {feature["id"]: feature for feature in counties["features"]}
+counties = dict(counties, features=[feature_index[f] for f in md["fips"] if f in feature_index])
 
 # ---- 5. Pretty County Names and Dates ----
 county_pretty = {
@@ -89,9 +205,13 @@ county_pretty = {
     "worcester": "Worcester County"
 }
 
-md["PrettyCounty"] = md["County"].map(county_pretty)
-md["PrettyDate"] = pd.to_datetime(md["Date"]).dt.strftime("%B %d, %Y")
-latest_date = pd.to_datetime(md["Date"]).max()
+md["PrettyCounty"] = md["County"].cat.rename_categories(county_pretty).astype(str)
+# Parse once (bls_api.py writes ISO dates, so no format inference) and reuse for both labels
+dates = md["Date"]
+if not pd.api.types.is_datetime64_any_dtype(dates):
+    dates = pd.to_datetime(dates, format="%Y-%m-%d", cache=True)
+md["PrettyDate"] = dates.dt.strftime("%B %d, %Y")
+latest_date = dates.max()
 title_date = latest_date.strftime("%B %Y")
 
 # ---- 6. Metric colors and formatting ----
@@ -111,47 +231,69 @@ def format_metric_value(metric_name):
     else:
         return "%{customdata[1]:,}"
 
-# ---- 7. Generate and save HTML maps ----
-def make_md_map(metric, colorscale):
-    fig = px.choropleth_mapbox(
-        md,
-        geojson=counties,
-        locations="fips",
-        color=metric,
-        color_continuous_scale=colorscale,
-        mapbox_style="open-street-map",
-        center={"lat": 39.0, "lon": -76.7},
-        zoom=6.7,
-        opacity=0.8,
-        hover_data=["PrettyCounty", metric, "PrettyDate"],
-        labels={metric: metric.replace('_', ' ').title()}
-    )
+# ---- 7. Build one trace per metric ----
+# Hover columns shared by every metric, converted to an array once
+base_custom = md[["PrettyCounty", "PrettyDate"]].to_numpy()
 
-    # Customize hover template
+def make_md_map(metric, colorscale):
+    """Choropleth trace for one metric (its own colorscale, so no shared coloraxis)."""
+    label = metric.replace('_', ' ').title()
     value_format = format_metric_value(metric)
-    fig.update_traces(
+
+    # Built directly as a graph_objects trace: no Plotly Express column inference / hover frame
+    return go.Choroplethmapbox(
+        geojson=counties,
+        featureidkey="id",
+        locations=md["fips"].tolist(),
+        z=md[metric].tolist(),
+        colorscale=colorscale,
+        marker_opacity=0.8,
+        customdata=np.column_stack([base_custom[:, 0], md[metric].to_numpy(), base_custom[:, 1]]),
+        # Customize hover template
         hovertemplate=(
             "<b>%{customdata[0]}</b><br>"
-            f"{metric.replace('_',' ').title()}: {value_format}<br>"
+            f"{label}: {value_format}<br>"
             "Date: %{customdata[2]}<br>"
             "<extra></extra>"
-        )
+        ),
+        colorbar={"title": {"text": label}},
+        name=metric,
     )
 
-    fig.update_layout(
-        title=f"Maryland County {metric.replace('_', ' ').title()} — {title_date}",
-        margin={"r":0, "t":40, "l":0, "b":0}
-    )
+def map_title(metric):
+    return f"Maryland County {metric.replace('_', ' ').title()} — {title_date}"
+
+# ---- 8. One figure, one metric visible at a time ----
+# The GeoJSON is embedded once instead of once per metric file
+metrics = list(metric_colors)
+fig = go.Figure()
+for i, (metric, colorscale) in enumerate(metric_colors.items()):
+    trace = make_md_map(metric, colorscale)
+    trace.visible = i == 0
+    fig.add_trace(trace)
 
-    # Save HTML
-    filename = f"{metric.replace(' ','_')}_choropleth.html"
-    output_path = os.path.join(output_dir, filename)
-    fig.write_html(output_path)
+fig.update_layout(
+    title=map_title(metrics[0]),
+    mapbox={"style": "open-street-map", "center": {"lat": 39.0, "lon": -76.7}, "zoom": 6.7},
+    margin={"r":0, "t":40, "l":0, "b":0},
+    updatemenus=[{
+        "buttons": [
+            {
+                "label": metric,
+                "method": "update",
+                "args": [{"visible": [m == metric for m in metrics]}, {"title": map_title(metric)}],
+            }
+            for metric in metrics
+        ],
+        "x": 0.01, "y": 0.99, "xanchor": "left", "yanchor": "top",
+    }],
+)
 
-    # Print relative path
-    relative_path = os.path.relpath(output_path, start=os.getcwd())
-    print(f"[INFO] Saved {filename} at {relative_path}\n")
+# Save HTML (plotly.js from the CDN rather than inlined)
+filename = "md_county_choropleth.html"
+output_path = os.path.join(output_dir, filename)
+fig.write_html(output_path, include_plotlyjs="cdn", full_html=True)
 
-# ---- 8. Loop through metrics ----
-for metric, colorscale in metric_colors.items():
-    make_md_map(metric, colorscale)
+# Print relative path
+relative_path = os.path.relpath(output_path, start=os.getcwd())
+print(f"[INFO] Saved {filename} at {relative_path}\n")